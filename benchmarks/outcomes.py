@@ -0,0 +1,112 @@
+"""
+Time for a forked worker to read the outcome of a test run by another
+process, from the shared outcome table compared to asking the parent
+over a pipe, as the reports are relayed:
+
+    python benchmarks/outcomes.py [TESTS] [LOOKUPS]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytest_dependency.parallel import Channel  # noqa: E402
+from pytest_dependency.shared import OutcomeTable  # noqa: E402
+
+
+def in_child(run):
+    """
+    Run `run` in a forked child and return the time it reports.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if not pid:
+        os.close(read_fd)
+        elapsed = run()
+        Channel(write_fd).send(elapsed)
+        os._exit(0)
+    os.close(write_fd)
+    channel = Channel(read_fd)
+    messages = []
+    while not messages:
+        messages = channel.receive()
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+    return messages[0]
+
+
+def shared(tests, lookups):
+    table = OutcomeTable(tests)
+    for test in tests:
+        table.set(test, random.random() < 0.9)
+
+    def run():
+        start = time.perf_counter()
+        for test in lookups:
+            table.get(test)
+        return time.perf_counter() - start
+
+    elapsed = in_child(run)
+    table.close()
+    return elapsed
+
+
+def relay(tests, lookups):
+    outcomes = {test: random.random() < 0.9 for test in tests}
+    request_read, request_write = os.pipe()
+    answer_read, answer_write = os.pipe()
+
+    def run():
+        requests = Channel(request_write)
+        answers = Channel(answer_read)
+        start = time.perf_counter()
+        for test in lookups:
+            requests.send(test)
+            messages = []
+            while not messages:
+                messages = answers.receive()
+        elapsed = time.perf_counter() - start
+        requests.send(None)
+        return elapsed
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if not pid:
+        Channel(write_fd).send(run())
+        os._exit(0)
+
+    requests = Channel(request_read)
+    answers = Channel(answer_write)
+    done = False
+    while not done:
+        for test in requests.receive():
+            if test is None:
+                done = True
+                break
+            answers.send(outcomes[test])
+    os.waitpid(pid, 0)
+    result = Channel(read_fd)
+    messages = []
+    while not messages:
+        messages = result.receive()
+    for fd in (request_read, request_write, answer_read, answer_write, read_fd, write_fd):
+        os.close(fd)
+    return messages[0]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    tests = [f"test_mod_{i // 100}.py::test_{i % 100}" for i in range(n)]
+    rng = random.Random(0)
+    lookups = [rng.choice(tests) for _ in range(count)]
+    for name, measure in (("shared", shared), ("relay", relay)):
+        elapsed = measure(tests, lookups)
+        print("%-7s %7d tests  %6d lookups  %8.3fs  %8.2fus per lookup"
+              % (name, n, count, elapsed, elapsed / count * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-test overhead of the plugin in a session without dependency markers.
+
+Run a generated suite of trivial tests with and without the plugin and
+report the difference of the wall clock time per test:
+
+    python benchmarks/overhead.py [NTESTS] [REPEAT]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def make_suite(path, ntests):
+    with open(os.path.join(path, "test_overhead.py"), "w") as f:
+        f.write("import pytest\n\n")
+        f.write("@pytest.mark.parametrize('x', range(%d))\n" % ntests)
+        f.write("def test_a(x):\n    pass\n")
+
+
+def run(path, *args):
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (root, env.get("PYTHONPATH")) if p
+    )
+    cmd = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"]
+    start = time.perf_counter()
+    subprocess.run(cmd + list(args), cwd=path, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    ntests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as path:
+        make_suite(path, ntests)
+        without = min(run(path, "-p", "no:dependency") for _ in range(repeat))
+        plugin = min(run(path, "-p", "pytest_dependency") for _ in range(repeat))
+    print("%d tests, best of %d" % (ntests, repeat))
+    print("without plugin: %.3fs" % without)
+    print("with plugin:    %.3fs" % plugin)
+    print("overhead:       %.2fus per test"
+          % ((plugin - without) / ntests * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Build time and query time of the reachability index on synthetic
+dependency graphs, compared to a breadth first search per query:
+
+    python benchmarks/reachability.py [NODES] [QUERIES]
+"""
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytest_dependency.graph import ReachabilityIndex  # noqa: E402
+
+
+def chain(n):
+    return [[i + 1] if i + 1 < n else [] for i in range(n)]
+
+
+def fan_out(n):
+    return [list(range(1, n))] + [[] for _ in range(n - 1)]
+
+
+def tree(n):
+    return [[c for c in (2 * i + 1, 2 * i + 2) if c < n] for i in range(n)]
+
+
+def layered(n, width=100, degree=3, seed=0):
+    """
+    Layers of `width` nodes, each depending on `degree` random nodes of
+    the previous layer.
+    """
+    rng = random.Random(seed)
+    successors = [[] for _ in range(n)]
+    for i in range(width, n):
+        layer = i // width
+        for _ in range(degree):
+            successors[rng.randrange((layer - 1) * width, layer * width)].append(i)
+    return successors
+
+
+def bfs(successors, a, b):
+    seen = {a}
+    queue = deque([a])
+    while queue:
+        node = queue.popleft()
+        if node == b:
+            return True
+        for other in successors[node]:
+            if other not in seen:
+                seen.add(other)
+                queue.append(other)
+    return False
+
+
+def measure(name, successors, queries):
+    n = len(successors)
+    start = time.perf_counter()
+    index = ReachabilityIndex(range(n), successors.__getitem__)
+    build = time.perf_counter() - start
+
+    rng = random.Random(1)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(queries)]
+    start = time.perf_counter()
+    for a, b in pairs:
+        index.reaches(a, b)
+    query = (time.perf_counter() - start) / queries
+
+    slow = pairs[:max(1, queries // 1000)]
+    start = time.perf_counter()
+    for a, b in slow:
+        bfs(successors, a, b)
+    search = (time.perf_counter() - start) / len(slow)
+
+    start = time.perf_counter()
+    reached = len(index.reachable(0))
+    closure = time.perf_counter() - start
+
+    print("%-8s %7d nodes  build %6.2fs  reaches %6.2fus  bfs %9.2fus  "
+          "descendants(0) %6d in %6.2fms"
+          % (name, n, build, query * 1e6, search * 1e6, reached, closure * 1e3))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    for name, make in (
+            ("chain", chain),
+            ("fan-out", fan_out),
+            ("tree", tree),
+            ("layered", layered),
+    ):
+        measure(name, make(n), queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import pytest
+
+@pytest.fixture(scope="module", params=range(1,10))
+def testcase(request):
+    param = request.param
+    return param
+
+@pytest.mark.dependency()
+def test_a(testcase):
+    if testcase % 7 == 0:
+        pytest.xfail("deliberate fail")
+        assert False
+
+@pytest.mark.dependency(depends=["test_a"], match_params=True)
+def test_b(testcase):
+    pass
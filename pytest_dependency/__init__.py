@@ -1,9 +1,19 @@
 """$DOC"""
 import pytest
 
+from .budget import ChainBudget
 from .config import conf
-from .dependency import Dependency, Item, DependencyFinder
-from .order import TestOrganizer
+from .dependency import Dependency, Item, DependencyFinder, any_of, at_least
+from .events import EventStream
+from .impact import ChangeImpact, Unsatisfiable
+from .learned import LearnedEdges
+from . import runtest
+from .order import TestOrganizer, OrderCheck
+from .parallel import ParallelRunner
+from .retry import PrerequisiteRetry
+from .snapshot import GraphSnapshot
+from .suggest import UnknownDependencies
+from .summary import BlockedWork
 
 __version__ = "$VERSION"
 __revision__ = "$REVISION"
@@ -17,7 +27,9 @@ def depends(request, other, scope=Dependency.SCOPE_DEFAULT):
     other has been registered previously.  This has the same effect as
     the `depends` keyword argument to the :func:`pytest.mark.dependency`
     marker.  In contrast to the marker, this function may be called at
-    runtime during a test.
+    runtime during a test.  The dependencies are remembered in the
+    cache, so that the next run puts the test after them when
+    reordering.
 
     :param request: the value of the `request` pytest fixture related
         to the current test.
@@ -28,40 +40,85 @@ def depends(request, other, scope=Dependency.SCOPE_DEFAULT):
 
     .. versionadded:: 0.2
     """
-    item = request.node
-    Item.get(item).check_skip(*Dependency.read_list(scope, *other))
+    item = Item.get(request.node)
+    dependencies = tuple(Dependency.read_list(scope, *other))
+    learned = LearnedEdges.get(request.config)
+    if learned is not None and isinstance(item, Item):
+        learned.record(item, dependencies)
+    item.check_skip(*dependencies)
 
 
 def pytest_addoption(parser):
     return conf.pytest_addoption(parser)
 
 
+def pytest_addhooks(pluginmanager):
+    from . import hooks
+    pluginmanager.add_hookspecs(hooks)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_dependency_resolve(item, dependency):
+    """
+    Look up the dependency by its name in its scope.
+    """
+    resolved = DependencyFinder.lookup(Item.get(item), dependency)
+    if resolved is None:
+        return None
+    return resolved.pytest_item
+
+
 def pytest_configure(config):
     conf.pytest_configure(config)
     config.addinivalue_line(
         'markers',
-        "dependency(name=None, depends=[]): "
+        "dependency(name=None, depends=[], match_params=False, "
+        "budget=None, retries=None, max_duration=None, after=[], "
+        "resources=[], exclusive=False): "
         "mark a test to be used as a dependency for "
         "other tests or to depend on other tests.",
     )
+    if conf.events:
+        EventStream.start(conf.events)
+    config.pluginmanager.register(runtest, runtest.PLUGIN_NAME)
+    config.pluginmanager.register(BlockedWork(config), BlockedWork.PLUGIN_NAME)
+    config.pluginmanager.register(LearnedEdges(config), LearnedEdges.PLUGIN_NAME)
+    config.pluginmanager.register(UnknownDependencies(), UnknownDependencies.PLUGIN_NAME)
 
 
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    """
-    Store the test outcome if this item is marked "dependency".
-    """
-    return Item.get(item).pytest_runtest_makereport()
-
-
-def pytest_runtest_setup(item):
-    """
-    Check dependencies if this item is marked "dependency".
-    Skip if any of the dependencies has not been run successfully.
-    """
-    return Item.get(item).check_skip()
+def pytest_unconfigure(config):
+    EventStream.stop()
 
 
 def pytest_collection_modifyitems(session, config, items):
-    organizer = TestOrganizer(*items)
-    items[:] = list(organizer)
+    registered = Item.compile_all(*items)
+    learned = LearnedEdges.get(config).load(items)
+    ParallelRunner.setup(config, conf.workers, learned)
+    if conf.changed:
+        ChangeImpact.read(conf.changed, config.rootdir).select(config, items)
+
+    if conf.deselect_unsatisfiable and registered:
+        Unsatisfiable(*items).deselect(config, items)
+
+    if not registered:
+        # No test is marked, there is nothing to track, check or reorder.
+        config.pluginmanager.unregister(name=runtest.PLUGIN_NAME)
+        return
+
+    if conf.order == conf.ORDER_CHECK:
+        OrderCheck(*items).warn()
+    elif conf.order == conf.ORDER_REORDER:
+        if learned or any(
+                item.dependencies or item.groups or item.after
+                for item in registered
+        ):
+            if conf.graph:
+                items[:], edges = GraphSnapshot.reorder(config, conf.graph, items, learned)
+                runner = ParallelRunner.get(config)
+                if runner is not None:
+                    runner.edges = edges
+            else:
+                organizer = TestOrganizer(*items, learned=learned)
+                items[:] = list(organizer)
+    ChainBudget.setup(config, items)
+    PrerequisiteRetry.setup(config, items)
@@ -0,0 +1,6 @@
+import sys
+
+from .plan import main
+
+
+sys.exit(main())
@@ -0,0 +1,88 @@
+import pytest
+from _pytest.nodes import Item as PytestItem
+from typing import List, Optional
+
+from .config import conf
+from .dependency import Item
+from .graph import DependencyGraph
+
+
+class Chain(object):
+    """
+    A test and all the tests depending on it, sharing a time budget.
+    """
+
+    def __init__(self, root: Item, budget: float):
+        self.root = root
+        self.budget = budget
+        self.spent = 0.0
+
+    @property
+    def exceeded(self) -> bool:
+        return self.spent > self.budget
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__} {self.root.display_name} "
+            f"{self.spent:.2f}/{self.budget:.2f}s"
+        )
+
+
+class ChainBudget(object):
+    """
+    Skip the remaining tests of a dependency chain once the call
+    durations of its tests add up to more than its budget.
+
+    A chain starts at each test having a `budget` in its marker and,
+    if a default budget is set, at each test that has dependents but
+    no prerequisites.
+    """
+
+    PLUGIN_NAME = 'dependency-chain-budget'
+
+    def __init__(self, graph: DependencyGraph, default: Optional[float] = None):
+        self.__chains = {}
+        for root in graph:
+            budget = root.marker.budget if root.marker is not None else None
+            if budget is None:
+                if default is None:
+                    continue
+                if graph.prerequisites(root) or not graph.dependents(root):
+                    continue
+                budget = default
+            chain = Chain(root, float(budget))
+            for item in graph.descendants(root):
+                self.__chains.setdefault(item.pytest_item, []).append(chain)
+
+    def __len__(self):
+        return len(self.__chains)
+
+    def chains(self, item: PytestItem) -> List[Chain]:
+        return self.__chains.get(item, [])
+
+    @classmethod
+    def setup(cls, config, items: List[PytestItem]):
+        """
+        Register the plugin if any chain has a budget.
+        """
+        plugin = cls(DependencyGraph(*items), conf.chain_budget)
+        if plugin:
+            config.pluginmanager.register(plugin, cls.PLUGIN_NAME)
+
+    def pytest_runtest_setup(self, item: PytestItem):
+        for chain in self.chains(item):
+            if chain.exceeded:
+                pytest.skip(
+                    f"{Item.get(item).display_name} skipped, the chain of "
+                    f"{chain.root.display_name} exceeded its budget of "
+                    f"{chain.budget:.2f}s ({chain.spent:.2f}s spent)"
+                )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: PytestItem):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != 'call':
+            return
+        for chain in self.chains(item):
+            chain.spent += report.duration
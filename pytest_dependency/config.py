@@ -4,10 +4,32 @@ from .util import str_to_bool
 class Config(object):
     AUTO_MARK = "automark_dependency"
     IGNORE_UNKNOWN = "--ignore-unknown-dependency"
+    SUMMARY_JSON = "--dependency-summary-json"
+    CHANGED = "--dependency-changed"
+    CHAIN_BUDGET = "--dependency-chain-budget"
+    RETRIES = "--dependency-retries"
+    EVENTS = "--dependency-events"
+    ORDER = "--dependency-order"
+    DESELECT_UNSATISFIABLE = "--deselect-unsatisfiable"
+    WORKERS = "--dependency-workers"
+    GRAPH = "--dependency-graph"
+
+    ORDER_REORDER = "reorder"
+    ORDER_CHECK = "check"
+    ORDER_OFF = "off"
 
     def __init__(self):
         self.auto_mark = False
         self.ignore_unknown = False
+        self.summary_json = None
+        self.changed = None
+        self.chain_budget = None
+        self.retries = 0
+        self.events = None
+        self.order = self.ORDER_REORDER
+        self.deselect_unsatisfiable = False
+        self.workers = None
+        self.graph = None
 
     @classmethod
     def pytest_addoption(cls, parser):
@@ -22,10 +44,93 @@ class Config(object):
             default=False,
             help="ignore dependencies whose outcome is not known"
         )
+        parser.addoption(
+            cls.SUMMARY_JSON,
+            action="store",
+            default=None,
+            metavar="PATH",
+            help="write the failed dependencies ranked by the tests they "
+                 "blocked to a JSON file"
+        )
+        parser.addoption(
+            cls.CHANGED,
+            action="store",
+            default=None,
+            metavar="FILE",
+            help="only run the tests in the changed paths listed in FILE "
+                 "and the tests depending on them"
+        )
+        parser.addoption(
+            cls.CHAIN_BUDGET,
+            action="store",
+            type=float,
+            default=None,
+            metavar="SECONDS",
+            help="skip the remaining tests of a dependency chain once "
+                 "its tests took longer than SECONDS"
+        )
+        parser.addoption(
+            cls.RETRIES,
+            action="store",
+            type=int,
+            default=0,
+            metavar="N",
+            help="run failing tests that other tests depend on "
+                 "up to N times again"
+        )
+        parser.addoption(
+            cls.EVENTS,
+            action="store",
+            default=None,
+            metavar="PATH",
+            help="append the dependency events of the session to PATH "
+                 "as JSON lines"
+        )
+        parser.addoption(
+            cls.ORDER,
+            action="store",
+            choices=(cls.ORDER_REORDER, cls.ORDER_CHECK, cls.ORDER_OFF),
+            default=cls.ORDER_REORDER,
+            help="reorder the tests so that dependencies run first (the "
+                 "default), only check the order, or leave it alone"
+        )
+        parser.addoption(
+            cls.DESELECT_UNSATISFIABLE,
+            action="store_true",
+            default=False,
+            help="deselect the tests whose dependencies cannot be resolved, "
+                 "directly or indirectly"
+        )
+        parser.addoption(
+            cls.WORKERS,
+            action="store",
+            type=int,
+            default=None,
+            metavar="N",
+            help="run the groups of tests connected by dependencies in "
+                 "N forked worker processes"
+        )
+        parser.addoption(
+            cls.GRAPH,
+            action="store",
+            default=None,
+            metavar="PATH",
+            help="read the order of the tests from the graph snapshot in "
+                 "PATH if it matches the collection, otherwise write it"
+        )
 
     def pytest_configure(self, config):
         self.auto_mark = str_to_bool(config.getini(self.AUTO_MARK))
         self.ignore_unknown = config.getoption(self.IGNORE_UNKNOWN)
+        self.summary_json = config.getoption(self.SUMMARY_JSON)
+        self.changed = config.getoption(self.CHANGED)
+        self.chain_budget = config.getoption(self.CHAIN_BUDGET)
+        self.retries = config.getoption(self.RETRIES)
+        self.events = config.getoption(self.EVENTS)
+        self.order = config.getoption(self.ORDER)
+        self.deselect_unsatisfiable = config.getoption(self.DESELECT_UNSATISFIABLE)
+        self.workers = config.getoption(self.WORKERS)
+        self.graph = config.getoption(self.GRAPH)
 
 
 conf = Config()
@@ -1,3 +1,5 @@
 SCOPE_MODULE = 'module'
 SCOPE_CLASS = 'class'
 SCOPE_SESSION = 'session'
+SCOPE_PACKAGE = 'package'
+SCOPE_DIRECTORY = 'directory'
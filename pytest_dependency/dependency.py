@@ -1,10 +1,21 @@
+import os
+import threading
+
 import pytest
 from _pytest.nodes import Item as PytestItem, Node
 from _pytest.reports import TestReport
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from .config import conf
-from .constant import SCOPE_MODULE, SCOPE_CLASS, SCOPE_SESSION
+from .events import EventStream
+from .shared import OutcomeTable
+from .constant import (
+    SCOPE_MODULE,
+    SCOPE_CLASS,
+    SCOPE_SESSION,
+    SCOPE_PACKAGE,
+    SCOPE_DIRECTORY,
+)
 
 
 class Marker(object):
@@ -13,28 +24,85 @@ class Marker(object):
     NAME_FIELD = 'name'
     SCOPE_FIELD = 'scope'
     LIST_FIELD = 'depends'
+    MATCH_PARAMS_FIELD = 'match_params'
+    BUDGET_FIELD = 'budget'
+    RETRIES_FIELD = 'retries'
+    MAX_DURATION_FIELD = 'max_duration'
+    AFTER_FIELD = 'after'
+    RESOURCES_FIELD = 'resources'
+    EXCLUSIVE_FIELD = 'exclusive'
 
     FIELDS = (
         NAME_FIELD,
         SCOPE_FIELD,
         LIST_FIELD,
+        MATCH_PARAMS_FIELD,
+        BUDGET_FIELD,
+        RETRIES_FIELD,
+        MAX_DURATION_FIELD,
+        AFTER_FIELD,
+        RESOURCES_FIELD,
+        EXCLUSIVE_FIELD,
     )
 
     @classmethod
     def get(cls, item: PytestItem) -> Optional['Marker']:
-        marker = item.get_closest_marker(cls.MARKER_NAME)
-        if marker is None:
+        """
+        Merge all dependency markers of the item.
+
+        The markers are read in a single pass, the closest one first.
+        The dependencies, the `after` lists and the resources are
+        collected from all markers, each dependency keeping the scope of
+        the marker declaring it, and duplicates are dropped.  All other
+        fields are those of the closest marker, as is.
+        """
+        fields = None
+        depend_list = {}
+        after_list = {}
+        resources = {}
+        for marker in item.iter_markers(cls.MARKER_NAME):
+            kwargs = marker.kwargs
+            if fields is None:
+                fields = {field: kwargs.get(field) for field in cls.FIELDS}
+            scope = kwargs.get(cls.SCOPE_FIELD) or Dependency.SCOPE_DEFAULT
+            for dependency in kwargs.get(cls.LIST_FIELD) or ():
+                if isinstance(dependency, str):
+                    depend_list[scope, dependency] = None
+                elif isinstance(dependency, DependencyGroup):
+                    depend_list[dependency.scoped(scope)] = None
+                else:
+                    depend_list[tuple(dependency)] = None
+            for dependency in kwargs.get(cls.AFTER_FIELD) or ():
+                if isinstance(dependency, str):
+                    after_list[scope, dependency] = None
+                else:
+                    after_list[tuple(dependency)] = None
+            for resource in kwargs.get(cls.RESOURCES_FIELD) or ():
+                resources[resource] = None
+
+        if fields is None:
             return None
 
+        fields[cls.LIST_FIELD] = list(depend_list)
+        fields[cls.AFTER_FIELD] = list(after_list)
+        fields[cls.RESOURCES_FIELD] = list(resources)
         return cls(*(
-            marker.kwargs.get(field)
+            fields[field]
             for field in cls.FIELDS
         ))
 
-    def __init__(self, name, scope, depend_list):
+    def __init__(self, name, scope, depend_list, match_params, budget, retries, max_duration,
+                 after_list, resources, exclusive):
         self.name = name
         self.scope = scope
         self.depend_list = depend_list
+        self.match_params = bool(match_params)
+        self.budget = budget
+        self.retries = retries
+        self.max_duration = max_duration
+        self.after_list = after_list
+        self.resources = resources
+        self.exclusive = bool(exclusive)
 
 
 class Dependency(object):
@@ -44,59 +112,320 @@ class Dependency(object):
     LIST_FIELD = 'depends'
     SCOPE_FIELD = 'scope'
 
-    def __init__(self, scope, name):
+    def __init__(self, scope, name, param_id=None):
         self.scope = scope
         self.name = name
+        self.param_id = param_id
 
     @classmethod
-    def read_list(cls, scope, *dependencies) -> Iterable['Dependency']:
+    def read_list(cls, scope, *dependencies, param_id=None) -> Iterable['Dependency']:
+        """
+        Read a list of dependencies.
+
+        Groups of dependencies, see :func:`at_least`, are yielded as
+        :class:`DependencyGroup` having :class:`Dependency` members.
+        """
         for dependency in dependencies:
             if isinstance(dependency, str):
-                yield cls(scope, dependency)
+                yield cls(scope, dependency, param_id)
+            elif isinstance(dependency, Dependency):
+                yield dependency
+            elif isinstance(dependency, DependencyGroup):
+                yield DependencyGroup(dependency.count, *cls.read_list(
+                    scope, *dependency.dependencies, param_id=param_id,
+                ))
             else:
-                yield cls(*dependency)
+                yield cls(*dependency, param_id=param_id)
 
     @classmethod
-    def read_marker(cls, marker: Marker) -> Iterable['Dependency']:
+    def read_marker(cls, marker: Marker, param_id=None) -> Iterable['Dependency']:
+        """
+        Read the dependencies of a marker.
+
+        If the marker sets `match_params`, each dependency refers to the
+        instance of the named test having the parameter id `param_id`.
+        """
         scope = marker.scope or cls.SCOPE_DEFAULT
 
         if not marker.depend_list:
             return
 
-        yield from cls.read_list(scope, *marker.depend_list)
+        if not marker.match_params:
+            param_id = None
+
+        yield from cls.read_list(scope, *marker.depend_list, param_id=param_id)
+
+    @classmethod
+    def read_after(cls, marker: Marker, param_id=None) -> Iterable['Dependency']:
+        """
+        Read the tests the marked test is to run after, like
+        :meth:`read_marker`.
+        """
+        if not marker.after_list:
+            return
+
+        if not marker.match_params:
+            param_id = None
+
+        yield from cls.read_list(
+            marker.scope or cls.SCOPE_DEFAULT, *marker.after_list, param_id=param_id,
+        )
+
+    @property
+    def display_name(self):
+        if self.param_id is None:
+            return self.name
+        return f"{self.name}[{self.param_id}]"
+
+    @property
+    def key(self):
+        return self.scope, self.name, self.param_id
+
+    def __eq__(self, other):
+        if not isinstance(other, Dependency):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} [{self.scope}] {self.display_name}"
+
+
+class DependencyGroup(object):
+    """
+    A group of dependencies, at least `count` of which must pass.
+    """
+
+    def __init__(self, count: int, *dependencies):
+        if count < 1 or count > len(dependencies):
+            raise ValueError(
+                f"Cannot require {count} of {len(dependencies)} dependencies"
+            )
+        self.count = count
+        self.dependencies = tuple(
+            dependency if isinstance(dependency, (str, Dependency)) else tuple(dependency)
+            for dependency in dependencies
+        )
+
+    def scoped(self, scope) -> 'DependencyGroup':
+        """
+        The same group, with the scope set on the plain names.
+        """
+        return DependencyGroup(self.count, *(
+            (scope, dependency) if isinstance(dependency, str) else dependency
+            for dependency in self.dependencies
+        ))
+
+    @property
+    def display_name(self):
+        names = ", ".join(
+            dependency.display_name if isinstance(dependency, Dependency)
+            else str(dependency)
+            for dependency in self.dependencies
+        )
+        if self.count == 1:
+            return f"any of ({names})"
+        return f"at least {self.count} of ({names})"
+
+    def __eq__(self, other):
+        if not isinstance(other, DependencyGroup):
+            return NotImplemented
+        return (self.count, self.dependencies) == (other.count, other.dependencies)
+
+    def __hash__(self):
+        return hash((self.count, self.dependencies))
 
     def __repr__(self):
-        return f"{self.__class__.__name__} [{self.scope}] {self.name}"
+        return f"{self.__class__.__name__} {self.display_name}"
+
+
+def at_least(count: int, *dependencies) -> DependencyGroup:
+    """
+    Depend on at least `count` of the dependencies.
+
+    This may be used as an entry in the `depends` list of the
+    :func:`pytest.mark.dependency` marker or in the list passed to
+    :func:`pytest_dependency.depends`.  The dependencies are names or
+    (scope, name) tuples.
+    """
+    return DependencyGroup(count, *dependencies)
+
+
+def any_of(*dependencies) -> DependencyGroup:
+    """
+    Depend on any one of the dependencies, see :func:`at_least`.
+    """
+    return DependencyGroup(1, *dependencies)
+
+
+class Outcomes(object):
+    """
+    The numbers of items of a set that passed and failed.
+
+    The numbers are updated as the outcomes of the items are
+    registered, so checking them does not look at the items.  Updates
+    are serialized by a lock, reading the numbers does not need it.
+    """
+
+    def __init__(self, items: Iterable[Optional['Item']]):
+        items = tuple(items)
+        self.items = tuple(dict.fromkeys(
+            item
+            for item in items
+            if item is not None
+        ))
+        self.unknown = len(items) - len(self.items)
+        self.passed = 0
+        self.failed = 0
+        self.__results = {}
+        self.__lock = threading.Lock()
+
+    def update(self, item: 'Item', result: Optional[bool]):
+        with self.__lock:
+            previous = self.__results.get(item)
+            if previous == result:
+                return
+            if previous is True:
+                self.passed -= 1
+            elif previous is False:
+                self.failed -= 1
+            if result is True:
+                self.passed += 1
+            elif result is False:
+                self.failed += 1
+            self.__results[item] = result
+
+
+class Prerequisites(Outcomes):
+    """
+    The plain dependencies of an item, all of which must pass.
+    """
+
+    @property
+    def unsatisfied(self) -> int:
+        return len(self.items) - self.passed
+
+    @property
+    def satisfied(self) -> bool:
+        return self.passed == len(self.items)
+
+
+class Requirement(Outcomes):
+    """
+    A group of dependencies of an item, resolved to the items.
+    """
+
+    def __init__(self, group: DependencyGroup, items: Iterable[Optional['Item']]):
+        super().__init__(items)
+        self.group = group
+
+    @property
+    def count(self) -> int:
+        if conf.ignore_unknown:
+            return min(self.group.count, len(self.items))
+        return self.group.count
+
+    @property
+    def satisfied(self) -> bool:
+        return self.passed >= self.count
+
+    @property
+    def display_name(self):
+        return self.group.display_name
 
 
 class Status(object):
     """
     Status of a test item.
+
+    The outcomes are kept in a tuple that is replaced as a whole on
+    each update, so reading them needs no lock.
     """
 
     PHASES = ('setup', 'call', 'teardown')
-    SUCCESS = ['passed', 'passed', 'passed']
+    SUCCESS = ('passed', 'passed', 'passed')
+
+    __INDEX = {
+        phase: index
+        for index, phase in enumerate(PHASES)
+    }
 
     def __init__(self):
-        self.__results = {
-            phase: None
-            for phase in self.PHASES
-        }
+        self.__results = (None,) * len(self.PHASES)
+        self.__durations = (0.0,) * len(self.PHASES)
+        self.__lock = threading.Lock()
 
     def __str__(self):
         return "Status({})".format(
             ", ".join(
-                f"{phase}: {self.__results[phase]}"
-                for phase in self.PHASES
+                f"{phase}: {outcome}"
+                for phase, outcome in zip(self.PHASES, self.__results)
             )
         )
 
     def __iadd__(self, report: TestReport):
-        self.__results[report.when] = report.outcome
+        index = self.__INDEX[report.when]
+        with self.__lock:
+            results = list(self.__results)
+            results[index] = report.outcome
+            durations = list(self.__durations)
+            durations[index] = getattr(report, 'duration', 0.0)
+            self.__durations = tuple(durations)
+            self.__results = tuple(results)
         return self
 
     def __bool__(self):
-        return list(self.__results.values()) == self.SUCCESS
+        return self.__results == self.SUCCESS
+
+    @property
+    def result(self) -> Optional[bool]:
+        """
+        True if all phases passed, False if any phase did not pass, None
+        while the outcome is pending.
+        """
+        for outcome in self.__results:
+            if outcome is None:
+                return None
+            if outcome != 'passed':
+                return False
+        return True
+
+    @property
+    def started(self) -> bool:
+        """
+        Whether a report of the setup phase has been registered.
+        """
+        return self.__results[self.__INDEX['setup']] is not None
+
+    @property
+    def called(self) -> bool:
+        """
+        Whether the test function itself has been run.
+        """
+        return self.__results[self.__INDEX['call']] is not None
+
+    @property
+    def failed(self) -> bool:
+        """
+        Whether any phase failed, as opposed to passed or skipped.
+        """
+        return 'failed' in self.__results
+
+    @property
+    def duration(self) -> float:
+        return sum(self.__durations)
+
+    @property
+    def call_duration(self) -> Optional[float]:
+        """
+        The duration of the test function itself, None if not run.
+        """
+        index = self.__INDEX['call']
+        if self.__results[index] is None:
+            return None
+        return self.__durations[index]
 
 
 class AbstractItem(object):
@@ -124,6 +453,14 @@ class AbstractItem(object):
     def depend_items_setup(self) -> Iterable['Item']:
         raise NotImplementedError
 
+    @property
+    def requirements(self) -> Tuple['Requirement', ...]:
+        raise NotImplementedError
+
+    @property
+    def after_items(self) -> Tuple['Item', ...]:
+        raise NotImplementedError
+
     def __repr__(self):
         return repr(self.pytest_item)
 
@@ -138,6 +475,14 @@ class DummyItem(AbstractItem):
     def depend_items_setup(self) -> Iterable['Item']:
         yield from ()
 
+    @property
+    def requirements(self) -> Tuple['Requirement', ...]:
+        return ()
+
+    @property
+    def after_items(self) -> Tuple['Item', ...]:
+        return ()
+
 
 class Item(AbstractItem):
     """
@@ -145,30 +490,117 @@ class Item(AbstractItem):
     """
 
     __ITEMS = {}
+    __LOCK = threading.RLock()
+    __OUTCOMES = None
 
-    class NotDependency(Exception):
-        pass
+    @classmethod
+    def share_outcomes(cls, table: Optional[OutcomeTable]):
+        """
+        Publish the outcomes in `table`, and read those of the tests not
+        run by this process from it.  None stops sharing.
+        """
+        cls.__OUTCOMES = table
 
     @classmethod
     def get(cls, item: PytestItem) -> AbstractItem:
+        """
+        The registered item, created on first use.
+
+        Reading an item that is already registered needs no lock.  New
+        items are created under a lock and published in the registry
+        only when complete, so each pytest item gets a single instance.
+        """
         try:
-            if item not in cls.__ITEMS:
-                cls.__ITEMS[item] = cls(item)
             return cls.__ITEMS[item]
-        except cls.NotDependency:
-            return DummyItem(item)
+        except KeyError:
+            pass
 
-    def __init__(self, item: PytestItem):
+        with cls.__LOCK:
+            try:
+                return cls.__ITEMS[item]
+            except KeyError:
+                pass
+
+            marker = Marker.get(item)
+            if marker is None and not conf.auto_mark:
+                result = DummyItem(item)
+            else:
+                result = cls(item, marker)
+            cls.__ITEMS[item] = result
+            return result
+
+    @classmethod
+    def compile_all(cls, *items: PytestItem) -> List['Item']:
+        """
+        Register all items first, then resolve their dependencies.
+
+        Return the items marked "dependency".
+        """
+        registered = [
+            item
+            for item in map(cls.get, items)
+            if isinstance(item, cls)
+        ]
+        for item in registered:
+            item.compile()
+        return registered
+
+    def __init__(self, item: PytestItem, marker: Optional[Marker]):
         super().__init__(item)
-        self.__marker = Marker.get(item)
-        if self.__marker is None:
-            if not conf.auto_mark:
-                raise self.NotDependency
+        self.__marker = marker
         self.__status = Status()
+        dependencies = ()
+        if self.__marker is not None:
+            dependencies = tuple(dict.fromkeys(
+                Dependency.read_marker(self.__marker, self.param_id)
+            ))
+        self.__dependencies = tuple(
+            dependency
+            for dependency in dependencies
+            if isinstance(dependency, Dependency)
+        )
+        self.__groups = tuple(
+            dependency
+            for dependency in dependencies
+            if isinstance(dependency, DependencyGroup)
+        )
+        self.__after = ()
+        if self.__marker is not None:
+            self.__after = tuple(dict.fromkeys(
+                Dependency.read_after(self.__marker, self.param_id)
+            ))
+        self.__resolved = None
+        self.__prerequisites = None
+        self.__requirements = ()
+        self.__after_items = ()
+        self.__watchers = []
+        self.__lock = threading.Lock()
         DependencyFinder.register(self)
+        EventStream.emit(
+            EventStream.REGISTERED,
+            nodeid=item.nodeid,
+            name=self.display_name,
+        )
 
     def add_report(self, report: TestReport):
-        self.__status += report
+        with self.__lock:
+            self.__status += report
+            result = self.result
+            for outcomes in self.__watchers:
+                outcomes.update(self, result)
+            if self.__OUTCOMES is not None:
+                self.__OUTCOMES.set(self.pytest_item, result)
+        EventStream.emit(
+            EventStream.OUTCOME,
+            nodeid=report.nodeid,
+            phase=report.when,
+            outcome=report.outcome,
+            duration=getattr(report, 'duration', None),
+        )
+
+    @property
+    def status(self) -> Status:
+        return self.__status
 
     @property
     def marker_name(self):
@@ -192,41 +624,257 @@ class Item(AbstractItem):
             return f"{self.pytest_item.cls.__name__}::{self.item_name}"
         return self.item_name
 
+    def get_relative_name(self, base):
+        """
+        The name of the item relative to the directory `base`, as used in
+        the package and directory scopes.
+        """
+        if self.marker_name:
+            return self.marker_name
+        path = os.path.relpath(str(self.pytest_item.fspath), base)
+        nodeid = self.pytest_item.nodeid.replace("::()::", "::")
+        _, sep, rest = nodeid.partition("::")
+        return f"{path.replace(os.sep, '/')}{sep}{rest}"
+
+    @property
+    def param_id(self) -> Optional[str]:
+        callspec = getattr(self.pytest_item, 'callspec', None)
+        if callspec is None:
+            return None
+        return callspec.id
+
     @property
     def marker(self) -> Optional[Marker]:
         return self.__marker
 
+    @property
+    def max_duration(self) -> Optional[float]:
+        if self.marker is None:
+            return None
+        return self.marker.max_duration
+
+    @property
+    def too_slow(self) -> bool:
+        """
+        Whether the test function took longer than the `max_duration`
+        of the marker.
+        """
+        max_duration = self.max_duration
+        if max_duration is None:
+            return False
+        duration = self.__status.call_duration
+        return duration is not None and duration > max_duration
+
+    @property
+    def result(self) -> Optional[bool]:
+        """
+        The result as seen by the dependents: the status, except that a
+        test that was too slow did not pass.
+        """
+        if self.too_slow:
+            return False
+        result = self.__status.result
+        if result is None and self.__OUTCOMES is not None:
+            return self.__OUTCOMES.get(self.pytest_item)
+        return result
+
     @property
     def passed(self) -> bool:
-        return bool(self.__status)
+        return self.result is True
+
+    @property
+    def dependencies(self) -> Tuple[Dependency, ...]:
+        return self.__dependencies
 
     @property
-    def dependencies(self) -> Iterable[Dependency]:
+    def groups(self) -> Tuple[DependencyGroup, ...]:
+        return self.__groups
+
+    @property
+    def after(self) -> Tuple[Dependency, ...]:
+        return self.__after
+
+    @property
+    def resources(self) -> Tuple[str, ...]:
+        """
+        The names of the external resources the test uses.
+        """
         if self.marker is None:
-            return
-        yield from Dependency.read_marker(self.marker)
+            return ()
+        return tuple(self.marker.resources)
+
+    @property
+    def exclusive(self) -> bool:
+        """
+        Whether the test needs its resources for itself, rather than
+        sharing them with other tests.
+        """
+        return self.marker is not None and self.marker.exclusive
+
+    def compile(self):
+        """
+        Resolve the dependencies declared in the marker once.
+
+        The resolved dependencies are published last, so that other
+        threads see either nothing or the complete result.
+
+        The item watches the outcomes of its dependencies from then on:
+        the numbers of its dependencies that passed and failed are
+        updated as each outcome is registered, so checking them before
+        the test runs does not walk the dependencies.
+        """
+        with Item.__LOCK:
+            if self.__resolved is not None:
+                return
+            resolved = self.resolve(*self.dependencies)
+            self.__prerequisites = Prerequisites(depend for _, depend in resolved)
+            self.__requirements = self.require(*self.groups)
+            self.__after_items = tuple(
+                depend
+                for _, depend in self.resolve(*self.after)
+                if depend is not None and depend is not self
+            )
+            for outcomes in (self.__prerequisites,) + self.__requirements:
+                for item in outcomes.items:
+                    with item.__lock:
+                        item.__watchers.append(outcomes)
+                        outcomes.update(item, item.result)
+            self.__resolved = resolved
+        if EventStream.enabled():
+            self.__emit_resolved()
+
+    def __emit_resolved(self):
+        nodeid = self.pytest_item.nodeid
+        for dependency, depend in self.__resolved:
+            EventStream.emit(
+                EventStream.RESOLVED,
+                nodeid=nodeid,
+                dependency=dependency.display_name,
+                scope=dependency.scope,
+                resolved=depend.pytest_item.nodeid if depend else None,
+            )
+        for requirement in self.__requirements:
+            EventStream.emit(
+                EventStream.RESOLVED,
+                nodeid=nodeid,
+                dependency=requirement.display_name,
+                scope=None,
+                resolved=[depend.pytest_item.nodeid for depend in requirement.items],
+            )
+
+    def require(self, *groups: DependencyGroup) -> Tuple[Requirement, ...]:
+        return tuple(
+            Requirement(group, (
+                depend
+                for _, depend in self.resolve(*group.dependencies)
+            ))
+            for group in groups
+        )
+
+    @property
+    def requirements(self) -> Tuple[Requirement, ...]:
+        """
+        The groups of dependencies declared in the marker, resolved.
+        """
+        if self.__resolved is None:
+            self.compile()
+        return self.__requirements
+
+    @property
+    def after_items(self) -> Tuple['Item', ...]:
+        """
+        The tests to run before this one, without depending on them.
+        Unknown names are left out.
+        """
+        if self.__resolved is None:
+            self.compile()
+        return self.__after_items
+
+    def resolve(self, *dependencies: Dependency) -> Tuple[Tuple[Dependency, Optional['Item']], ...]:
+        return tuple(
+            (dependency, DependencyFinder.resolve(self, dependency))
+            for dependency in dependencies
+        )
+
+    @property
+    def resolved(self) -> Tuple[Tuple[Dependency, Optional['Item']], ...]:
+        """
+        The declared dependencies and the items they refer to, None if
+        unknown.
+        """
+        if self.__resolved is None:
+            self.compile()
+        return self.__resolved
 
     def depend_items_setup(self) -> Iterable['Item']:
-        yield from tuple(DependencyFinder.find_all(self, False, *self.dependencies))
+        yield from tuple(DependencyFinder.find_all(self, False))
 
     def depend_items(self, *dependencies: Dependency) -> Iterable['Item']:
-        if not dependencies:
-            dependencies = self.dependencies
         yield from DependencyFinder.find_all(self, conf.ignore_unknown, *dependencies)
 
     def check_skip(self, *dependencies: Dependency):
-        try:
-            for item in self.depend_items(*dependencies):
-                if not item.passed:
-                    pytest.skip(
-                        f"{self.display_name} depends on {item.display_name}, "
-                        f"which did not pass"
+        if dependencies:
+            resolved = self.resolve(*(
+                dependency
+                for dependency in dependencies
+                if isinstance(dependency, Dependency)
+            ))
+            requirements = self.require(*(
+                dependency
+                for dependency in dependencies
+                if isinstance(dependency, DependencyGroup)
+            ))
+            if self.__OUTCOMES is not None:
+                # Dependencies declared at runtime may be run by another
+                # process, wait for those that would have run before.
+                items = [item for _, item in resolved if item is not None]
+                for requirement in requirements:
+                    items.extend(requirement.items)
+                for item in items:
+                    self.__OUTCOMES.wait(item.pytest_item, self.pytest_item)
+            for requirement in requirements:
+                for item in requirement.items:
+                    requirement.update(item, item.result)
+        else:
+            resolved = self.resolved
+            requirements = self.requirements
+            prerequisites = self.__prerequisites
+            if (prerequisites.satisfied
+                    and (conf.ignore_unknown or not prerequisites.unknown)
+                    and all(requirement.satisfied for requirement in requirements)):
+                return
+
+        for dependency, item in resolved:
+            if item is None:
+                if conf.ignore_unknown:
+                    continue
+                from .suggest import UnknownDependencies
+
+                UnknownDependencies.record(self, dependency)
+                self.__skip(dependency.display_name, "which does not exist")
+            if not item.passed:
+                if item.too_slow:
+                    self.__skip(
+                        item.display_name,
+                        f"which took longer than {item.max_duration}s",
                     )
-        except DependencyFinder.DependencyNotFound as e:
-            pytest.skip(
-                f"{self.display_name} depends on {e.name}, "
-                f"which does not exist"
-            )
+                self.__skip(item.display_name, "which did not pass")
+
+        for requirement in requirements:
+            if not requirement.satisfied:
+                reason = f"of which {requirement.passed} passed"
+                if requirement.unknown:
+                    reason += f" and {requirement.unknown} do not exist"
+                self.__skip(requirement.display_name, reason)
+
+    def __skip(self, blocker, reason):
+        EventStream.emit(
+            EventStream.SKIPPED,
+            nodeid=self.pytest_item.nodeid,
+            blocker=blocker,
+            reason=reason,
+        )
+        pytest.skip(f"{self.display_name} depends on {blocker}, {reason}")
 
     def pytest_runtest_makereport(self):
         outcome = yield
@@ -239,9 +887,14 @@ class DependencyFinder(object):
         SCOPE_MODULE: pytest.Module,
         SCOPE_CLASS: pytest.Class,
         SCOPE_SESSION: pytest.Session,
+        SCOPE_PACKAGE: getattr(pytest, 'Package', None),
+        SCOPE_DIRECTORY: None,
     }
 
     NODE_ATTR = 'dependency_finder'
+    DIRECTORIES_ATTR = 'dependency_directories'
+
+    __LOCK = threading.RLock()
 
     class InvalidNode(Exception):
         def __init__(self, item, scope):
@@ -263,24 +916,90 @@ class DependencyFinder(object):
     def register(cls, item: Item):
         for scope in cls.SCOPE_CLASSES:
             try:
-                cls.get(item, scope)[item.get_name(scope)] = item
+                cls.get(item, scope).add(item)
             except cls.InvalidNode:
                 pass
 
     @classmethod
     def get(cls, item: Item, scope) -> 'DependencyFinder':
         pytest_item = item.pytest_item
-        node = pytest_item.getparent(cls.SCOPE_CLASSES[scope])
+        if scope == SCOPE_DIRECTORY:
+            return cls.get_directory(
+                pytest_item.session,
+                os.path.dirname(str(pytest_item.fspath)),
+            )
+        node_class = cls.SCOPE_CLASSES[scope]
+        if node_class is None:
+            raise cls.InvalidNode(item, scope)
+        node = pytest_item.getparent(node_class)
         if not node:
             raise cls.InvalidNode(item, scope)
-        if not hasattr(node, cls.NODE_ATTR):
-            setattr(node, cls.NODE_ATTR, cls(node, scope))
-        return getattr(node, cls.NODE_ATTR)
+        return cls.get_node(node, scope)
+
+    @classmethod
+    def get_node(cls, node: Node, scope) -> 'DependencyFinder':
+        """
+        The finder attached to a node, created on first use.
+
+        The finder is attached to the node only when complete, so that
+        reading it needs no lock.
+        """
+        finder = getattr(node, cls.NODE_ATTR, None)
+        if finder is not None:
+            return finder
+
+        with cls.__LOCK:
+            finder = getattr(node, cls.NODE_ATTR, None)
+            if finder is not None:
+                return finder
+            base = None
+            if scope == SCOPE_PACKAGE:
+                base = str(node.fspath)
+                if os.path.basename(base) == '__init__.py':
+                    base = os.path.dirname(base)
+            finder = cls(node, scope, base)
+            if scope == SCOPE_PACKAGE and node.parent is not None:
+                parent = node.parent.getparent(cls.SCOPE_CLASSES[scope])
+                if parent:
+                    cls.get_node(parent, scope).add_child(finder)
+            setattr(node, cls.NODE_ATTR, finder)
+            return finder
 
-    def __init__(self, node: Node, scope):
+    @classmethod
+    def get_directory(cls, session: pytest.Session, path) -> 'DependencyFinder':
+        """
+        The finder for the test modules in the directory `path`.
+
+        The finders of the parent directories are created up to the
+        root directory, each one having the finders of its
+        subdirectories as children.
+        """
+        directories = getattr(session, cls.DIRECTORIES_ATTR, None)
+        if directories is not None and path in directories:
+            return directories[path]
+
+        with cls.__LOCK:
+            if not hasattr(session, cls.DIRECTORIES_ATTR):
+                setattr(session, cls.DIRECTORIES_ATTR, {})
+            directories = getattr(session, cls.DIRECTORIES_ATTR)
+            if path not in directories:
+                finder = cls(session, SCOPE_DIRECTORY, path)
+                parent = os.path.dirname(path)
+                rootdir = str(session.config.rootdir)
+                if (parent != path and path != rootdir
+                        and os.path.commonpath([path, rootdir]) == rootdir):
+                    cls.get_directory(session, parent).add_child(finder)
+                directories[path] = finder
+            return directories[path]
+
+    def __init__(self, node: Node, scope, base=None):
         self.__node = node
         self.__scope = scope
+        self.__base = base
         self.__items = {}
+        self.__params = {}
+        self.__children = {}
+        self.__index = None
 
     @property
     def node(self) -> Node:
@@ -290,9 +1009,23 @@ class DependencyFinder(object):
     def scope(self):
         return self.__scope
 
+    @property
+    def base(self) -> Optional[str]:
+        """
+        The directory the names are relative to, for the package and
+        directory scopes.
+        """
+        return self.__base
+
     def __repr__(self):
+        if self.base is not None:
+            return f"{self.__class__.__name__} [{self.scope}] {self.base}"
         return f"{self.__class__.__name__} [{self.scope}] {self.node}"
 
+    def add_child(self, finder: 'DependencyFinder'):
+        path = os.path.relpath(finder.base, self.base)
+        self.__children[path.replace(os.sep, '/')] = finder
+
     def __contains__(self, item):
         return item in self.__items
 
@@ -315,11 +1048,118 @@ class DependencyFinder(object):
         return self.__items.values()
 
     def __setitem__(self, name, item: Item):
+        # Items are only added while registered in Item.get, which
+        # holds the registry lock.
         if name in self:
             if self[name] != item:
                 raise self.DuplicateName(name, item)
         self.__items[name] = item
 
+    def add(self, item: Item):
+        """
+        Register an item under its name in this scope.
+
+        Instances of parametrized tests are also indexed by the name of
+        the test without the parameters and their parameter id, so that
+        dependencies with `match_params` are resolved without building
+        names.
+        """
+        if self.base is None:
+            name = item.get_name(self.scope)
+        else:
+            name = item.get_relative_name(self.base)
+        self[name] = item
+
+        param_id = item.param_id
+        if param_id is None:
+            return
+        suffix = f"[{param_id}]"
+        if name.endswith(suffix):
+            self.__params[name[:-len(suffix)], param_id] = item
+
+    def __descend(self, name):
+        """
+        Find the child finder for a name having a path relative to this
+        one, and the name relative to the child.
+        """
+        path, sep, rest = name.partition('::')
+        parts = path.split('/')
+        for i in range(1, len(parts)):
+            child = self.__children.get('/'.join(parts[:i]))
+            if child is not None:
+                return child, '/'.join(parts[i:]) + sep + rest
+        return None, None
+
+    def find(self, dependency: Dependency) -> Item:
+        """
+        Find the item for a dependency.
+
+        If the name is not known in this finder, it is looked up in the
+        child finder its path points to, walking down one level of the
+        hierarchy at a time.
+        """
+        try:
+            if dependency.param_id is None:
+                return self.__items[dependency.name]
+            return self.__params[dependency.name, dependency.param_id]
+        except KeyError:
+            pass
+
+        if self.__children:
+            child, name = self.__descend(dependency.name)
+            if child is not None:
+                try:
+                    return child.find(
+                        Dependency(dependency.scope, name, dependency.param_id)
+                    )
+                except self.DependencyNotFound:
+                    pass
+
+        raise self.DependencyNotFound(dependency.display_name)
+
+    def similar(self, name: str, exclude: Optional[Item] = None, limit: int = 3) -> List[str]:
+        """
+        The names of this finder closest to `name`, other than those of
+        the item `exclude`, for hints on unknown dependencies.  The index
+        is only built on first use.
+        """
+        from .suggest import NameIndex
+
+        if self.__index is None or len(self.__index) != len(self.__items):
+            self.__index = NameIndex(self.__items)
+        return [
+            candidate
+            for candidate in self.__index.similar(name, limit + 1)
+            if self.__items[candidate] is not exclude
+        ][:limit]
+
+    @classmethod
+    def lookup(cls, item: Item, dependency: Dependency) -> Optional[Item]:
+        """
+        Look up a dependency by its name in the scope of the item.
+
+        This is the default implementation of the
+        `pytest_dependency_resolve` hook.
+        """
+        try:
+            return cls.get(item, dependency.scope).find(dependency)
+        except (cls.InvalidNode, cls.DependencyNotFound):
+            return None
+
+    @classmethod
+    def resolve(cls, item: Item, dependency: Dependency) -> Optional[Item]:
+        pytest_item = item.pytest_item
+        resolved = pytest_item.config.hook.pytest_dependency_resolve(
+            item=pytest_item,
+            dependency=dependency,
+        )
+        if resolved is None:
+            return None
+        resolved = Item.get(resolved)
+        if not isinstance(resolved, Item):
+            return None
+        return resolved
+
     @classmethod
     def find_all(
             cls,
@@ -327,9 +1167,20 @@ class DependencyFinder(object):
             ignore_unknown: bool,
             *dependencies: Dependency,
     ) -> Iterable[Item]:
-        for dependency in dependencies:
-            try:
-                yield DependencyFinder.get(item, dependency.scope)[dependency.name]
-            except DependencyFinder.DependencyNotFound:
+        """
+        Find the items for the dependencies.
+
+        If no dependencies are given, the ones declared in the marker of
+        the item are used, as resolved at collection.
+        """
+        if dependencies:
+            resolved = item.resolve(*dependencies)
+        else:
+            resolved = item.resolved
+
+        for dependency, depend in resolved:
+            if depend is None:
                 if not ignore_unknown:
-                    raise
+                    raise cls.DependencyNotFound(dependency.display_name)
+                continue
+            yield depend
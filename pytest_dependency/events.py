@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+
+
+class EventStream(object):
+    """
+    Append-only stream of dependency events, one JSON object per line.
+
+    Events are buffered in memory and written in batches by a background
+    thread, so the test run never waits for the file.  There is at most
+    one stream at a time; :meth:`emit` does nothing unless a stream has
+    been started.
+    """
+
+    REGISTERED = 'registered'
+    RESOLVED = 'resolved'
+    OUTCOME = 'outcome'
+    SKIPPED = 'skipped'
+    SCHEDULED = 'scheduled'
+
+    INTERVAL = 0.5
+    BATCH_SIZE = 1000
+
+    __current = None
+
+    def __init__(self, path):
+        self.__file = open(path, 'a')
+        self.__buffer = []
+        self.__lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__closed = False
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name='pytest-dependency-events',
+            daemon=True,
+        )
+        self.__thread.start()
+
+    @classmethod
+    def start(cls, path) -> 'EventStream':
+        cls.stop()
+        cls.__current = cls(path)
+        return cls.__current
+
+    @classmethod
+    def stop(cls):
+        stream = cls.__current
+        cls.__current = None
+        if stream is not None:
+            stream.close()
+
+    @classmethod
+    def discard(cls):
+        """
+        Forget the stream without writing it, e.g. in a forked process
+        that must leave the file to its parent.
+        """
+        cls.__current = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls.__current is not None
+
+    @classmethod
+    def emit(cls, event, **fields):
+        stream = cls.__current
+        if stream is not None:
+            stream.put(event, fields)
+
+    def put(self, event, fields):
+        fields['event'] = event
+        fields['time'] = time.time()
+        with self.__lock:
+            self.__buffer.append(fields)
+            full = len(self.__buffer) >= self.BATCH_SIZE
+        if full:
+            self.__wakeup.set()
+
+    def __flush(self):
+        with self.__lock:
+            batch, self.__buffer = self.__buffer, []
+        if batch:
+            self.__file.write(''.join(
+                json.dumps(fields, default=str) + '\n'
+                for fields in batch
+            ))
+            self.__file.flush()
+
+    def __run(self):
+        while not self.__closed:
+            self.__wakeup.wait(self.INTERVAL)
+            self.__wakeup.clear()
+            self.__flush()
+
+    def close(self):
+        self.__closed = True
+        self.__wakeup.set()
+        self.__thread.join()
+        self.__flush()
+        self.__file.close()
@@ -0,0 +1,301 @@
+from bisect import bisect_right
+from collections import deque
+
+from _pytest.nodes import Item as PytestItem
+from typing import Callable, Hashable, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from .dependency import Item, DependencyFinder
+
+
+class ReachabilityIndex(object):
+    """
+    Interval labels answering which nodes of a directed graph can be
+    reached from which.
+
+    The strongly connected components are contracted first.  The
+    components are numbered in the post order of a depth first search,
+    so that the components reached through the edges of the search tree
+    of a component have consecutive numbers.  Each component is then
+    labeled with the intervals of the numbers it reaches, merging the
+    labels of its successors, successors first.  For chains and trees
+    each label is a single interval; other edges add intervals only
+    where they reach outside of the tree.
+
+    Checking whether a node reaches another one is a binary search in
+    the label.  The nodes reached from a node are read off the
+    intervals, in time proportional to their number.
+    """
+
+    def __init__(self, nodes: Sequence[Hashable], successors: Callable[[Hashable], Iterable[Hashable]]):
+        self.__nodes = tuple(nodes)
+        component = self.__components(successors)
+        count = max(component.values(), default=-1) + 1
+        members = [[] for _ in range(count)]
+        for node in self.__nodes:
+            members[component[node]].append(node)
+        edges = [set() for _ in range(count)]
+        for node in self.__nodes:
+            source = component[node]
+            for other in successors(node):
+                target = component[other]
+                if target != source:
+                    edges[source].add(target)
+
+        post, low = self.__number(edges)
+        by_post = [None] * count
+        for c in range(count):
+            by_post[post[c]] = c
+        labels = [None] * count
+        for c in by_post:
+            intervals = [(low[c], post[c])]
+            for target in edges[c]:
+                label = labels[target]
+                intervals.extend(zip(label[::2], label[1::2]))
+            labels[c] = self.__merge(intervals)
+
+        self.__component = component
+        self.__post = post
+        self.__labels = labels
+        self.__members = [members[c] for c in by_post]
+
+    def __components(self, successors) -> dict:
+        """
+        Tarjan's algorithm, without recursion.  The components are
+        numbered in reverse topological order.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        component = {}
+        count = 0
+        for root in self.__nodes:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors(root)))]
+            while work:
+                node, edges = work[-1]
+                for other in edges:
+                    if other not in index:
+                        index[other] = lowlink[other] = len(index)
+                        stack.append(other)
+                        on_stack.add(other)
+                        work.append((other, iter(successors(other))))
+                        break
+                    if other in on_stack and index[other] < lowlink[node]:
+                        lowlink[node] = index[other]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+                    if lowlink[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component[member] = count
+                            if member == node:
+                                break
+                        count += 1
+        return component
+
+    @staticmethod
+    def __number(edges: List[Set[int]]) -> Tuple[List[int], List[int]]:
+        """
+        Number the components of the acyclic graph in post order, and
+        find the lowest number in the search tree of each.
+        """
+        count = len(edges)
+        post = [-1] * count
+        low = [0] * count
+        seen = [False] * count
+        number = 0
+        # Start from the sources, the components without predecessors.
+        # Tarjan numbers these last.
+        for root in reversed(range(count)):
+            if seen[root]:
+                continue
+            seen[root] = True
+            low[root] = number
+            work = [(root, iter(edges[root]))]
+            while work:
+                c, targets = work[-1]
+                for target in targets:
+                    if not seen[target]:
+                        seen[target] = True
+                        low[target] = number
+                        work.append((target, iter(edges[target])))
+                        break
+                else:
+                    work.pop()
+                    post[c] = number
+                    number += 1
+        return post, low
+
+    @staticmethod
+    def __merge(intervals: List[Tuple[int, int]]) -> Tuple[int, ...]:
+        intervals.sort()
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1] + 1:
+                if end > merged[-1]:
+                    merged[-1] = end
+            else:
+                merged.extend((start, end))
+        return tuple(merged)
+
+    def __len__(self):
+        return len(self.__nodes)
+
+    def reaches(self, a, b) -> bool:
+        """
+        Whether `b` can be reached from `a`.  Each node reaches itself.
+        """
+        label = self.__labels[self.__component[a]]
+        number = self.__post[self.__component[b]]
+        i = bisect_right(label, number)
+        return i % 2 == 1 or (i > 0 and label[i - 1] == number)
+
+    def reachable(self, *nodes) -> Set[Hashable]:
+        """
+        The nodes that can be reached from any of `nodes`, including
+        these.
+        """
+        intervals = []
+        for node in nodes:
+            label = self.__labels[self.__component[node]]
+            intervals.extend(zip(label[::2], label[1::2]))
+        label = self.__merge(intervals)
+        result = set()
+        for start, end in zip(label[::2], label[1::2]):
+            for members in self.__members[start:end + 1]:
+                result.update(members)
+        return result
+
+
+class DependencyGraph(object):
+    """
+    Resolved dependencies between a set of collected items.
+
+    Only items marked "dependency" are part of the graph.  Unknown
+    dependencies and dependencies on items outside of the set are
+    left out.
+    """
+
+    def __init__(self, *items: PytestItem):
+        self.__items = tuple(
+            item
+            for item in map(Item.get, items)
+            if isinstance(item, Item)
+        )
+        self.__prerequisites = {}
+        self.__ancestor_index = None
+        self.__descendant_index = None
+        self.__dependents = {
+            item: []
+            for item in self.__items
+        }
+        for item in self.__items:
+            prerequisites = tuple(dict.fromkeys(
+                depend
+                for depend in self.__depend_items(item)
+                if depend in self.__dependents and depend is not item
+            ))
+            self.__prerequisites[item] = prerequisites
+            for depend in prerequisites:
+                self.__dependents[depend].append(item)
+
+    @staticmethod
+    def __depend_items(item: Item) -> Iterator[Item]:
+        yield from DependencyFinder.find_all(item, True)
+        for requirement in item.requirements:
+            yield from requirement.items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self.__items)
+
+    def __contains__(self, item):
+        return item in self.__prerequisites
+
+    def prerequisites(self, item: Item) -> Tuple[Item, ...]:
+        return self.__prerequisites[item]
+
+    def dependents(self, item: Item) -> List[Item]:
+        return self.__dependents[item]
+
+    @property
+    def ancestor_index(self) -> ReachabilityIndex:
+        """
+        The reachability index along the prerequisites, built on first use.
+        """
+        if self.__ancestor_index is None:
+            self.__ancestor_index = ReachabilityIndex(self.__items, self.prerequisites)
+        return self.__ancestor_index
+
+    @property
+    def descendant_index(self) -> ReachabilityIndex:
+        """
+        The reachability index along the dependents, built on first use.
+        """
+        if self.__descendant_index is None:
+            self.__descendant_index = ReachabilityIndex(self.__items, self.dependents)
+        return self.__descendant_index
+
+    def ancestors(self, *items: Item) -> Set[Item]:
+        """
+        The items together with all their direct and indirect prerequisites.
+        """
+        return self.ancestor_index.reachable(*items)
+
+    def descendants(self, *items: Item) -> Set[Item]:
+        """
+        The items together with all items depending on them, directly or
+        indirectly.
+        """
+        return self.descendant_index.reachable(*items)
+
+    def reaches(self, a: Item, b: Item) -> bool:
+        """
+        Whether `b` depends on `a`, directly or indirectly.
+        """
+        return self.descendant_index.reaches(a, b)
+
+    def topological(self) -> List[Item]:
+        """
+        All items, each one after its prerequisites.
+
+        Items that are ready at the same time keep their original
+        order.  Items on a circular dependency come last.
+        """
+        waiting = {
+            item: len(prerequisites)
+            for item, prerequisites in self.__prerequisites.items()
+        }
+        ready = deque(
+            item
+            for item in self.__items
+            if not waiting[item]
+        )
+        result = []
+        while ready:
+            item = ready.popleft()
+            result.append(item)
+            for dependent in self.__dependents[item]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    ready.append(dependent)
+
+        if len(result) < len(self.__items):
+            result.extend(
+                item
+                for item in self.__items
+                if waiting[item]
+            )
+        return result
@@ -0,0 +1,24 @@
+from pluggy import HookspecMarker
+
+hookspec = HookspecMarker("pytest")
+
+
+@hookspec(firstresult=True)
+def pytest_dependency_resolve(item, dependency):
+    """
+    Find the test item a dependency refers to.
+
+    The dependencies declared in the markers are resolved once at
+    collection, after all items have been registered.  Dependencies
+    passed to :func:`pytest_dependency.depends` are resolved when the
+    function is called.
+
+    :param item: the pytest item declaring the dependency.
+    :param dependency: the dependency, having the attributes `scope`,
+        `name`, and `param_id`.
+    :return: the pytest item the dependency refers to, or None to let
+        the next implementation try.  The default implementation looks
+        up the name of the dependency in its scope.
+
+    Stops at first non-None result.
+    """
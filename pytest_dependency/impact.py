@@ -0,0 +1,130 @@
+import os
+from collections import deque
+
+import pytest
+from _pytest.nodes import Item as PytestItem
+from typing import List, Set
+
+from .config import conf
+from .dependency import Item
+from .graph import DependencyGraph
+
+
+class ChangeImpact(object):
+    """
+    Select the tests affected by a set of changed test modules.
+
+    These are the tests in the changed modules and all tests depending
+    on them, directly or indirectly.  The prerequisites of the selected
+    tests are selected as well, because otherwise the dependent tests
+    would be skipped.
+    """
+
+    def __init__(self, *paths: str):
+        self.__paths = frozenset(
+            os.path.normcase(os.path.abspath(path))
+            for path in paths
+        )
+
+    @classmethod
+    def read(cls, filename, rootdir) -> 'ChangeImpact':
+        """
+        Read the changed paths, one per line, relative to `rootdir`.
+        """
+        try:
+            with open(filename) as f:
+                lines = [line.strip() for line in f]
+        except OSError as e:
+            raise pytest.UsageError(f"cannot read changed paths: {e}") from None
+        return cls(*(
+            os.path.join(str(rootdir), line)
+            for line in lines
+            if line and not line.startswith('#')
+        ))
+
+    def changed(self, item: PytestItem) -> bool:
+        path = os.path.normcase(os.path.abspath(str(item.fspath)))
+        while True:
+            if path in self.__paths:
+                return True
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+
+    def select(self, config, items: List[PytestItem]):
+        graph = DependencyGraph(*items)
+        changed = [
+            item
+            for item in items
+            if self.changed(item)
+        ]
+        selected = graph.ancestors(*graph.descendants(*(
+            depend
+            for depend in map(Item.get, changed)
+            if depend in graph
+        )))
+        keep = set(changed)
+        keep.update(item.pytest_item for item in selected)
+
+        deselected = [item for item in items if item not in keep]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item in keep]
+
+
+class Unsatisfiable(object):
+    """
+    Find the tests that would be skipped for unknown dependencies.
+
+    These are the tests having a dependency that cannot be resolved or
+    a group with too few known members, and, transitively, the tests
+    depending on them.
+    """
+
+    def __init__(self, *items: PytestItem):
+        self.__graph = DependencyGraph(*items)
+        self.__items = set()
+        queue = deque(
+            item
+            for item in self.__graph
+            if self.__unresolved(item)
+        )
+        self.__items.update(queue)
+        while queue:
+            for dependent in self.__graph.dependents(queue.popleft()):
+                if dependent not in self.__items and self.__blocked(dependent):
+                    self.__items.add(dependent)
+                    queue.append(dependent)
+
+    @property
+    def items(self) -> Set[Item]:
+        return self.__items
+
+    @staticmethod
+    def __unresolved(item: Item) -> bool:
+        if not conf.ignore_unknown and any(
+                depend is None
+                for _, depend in item.resolved
+        ):
+            return True
+        return any(
+            len(requirement.items) < requirement.count
+            for requirement in item.requirements
+        )
+
+    def __blocked(self, item: Item) -> bool:
+        if any(depend in self.__items for _, depend in item.resolved):
+            return True
+        return any(
+            sum(1 for depend in requirement.items if depend not in self.__items)
+            < requirement.count
+            for requirement in item.requirements
+        )
+
+    def deselect(self, config, items: List[PytestItem]):
+        unsatisfiable = {item.pytest_item for item in self.__items}
+        deselected = [item for item in items if item in unsatisfiable]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item not in unsatisfiable]
@@ -0,0 +1,145 @@
+import os
+import threading
+
+from _pytest.nodes import Item as PytestItem
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .dependency import Dependency, DependencyGroup, Item
+
+
+class LearnedEdges(object):
+    """
+    Remember the dependencies declared at runtime with
+    :func:`pytest_dependency.depends`, so that the next run can order
+    the tests accordingly.
+
+    The dependencies are kept in the cache by node id.  The dependencies
+    of a test are replaced by the ones observed each time it runs,
+    except those on tests not collected in that run.  A dependency is
+    dropped when one of its tests is no longer collected from its
+    module.  Only modules collected in full count for this, i.e. not
+    narrowed to some tests by node ids, `-k`, `-m` or `--deselect`.
+    """
+
+    PLUGIN_NAME = 'dependency-learned-edges'
+    CACHE_KEY = 'dependency/edges'
+
+    def __init__(self, config):
+        self.__config = config
+        self.__edges = {}
+        self.__observed = {}
+        self.__items = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get(cls, config) -> Optional['LearnedEdges']:
+        return config.pluginmanager.get_plugin(cls.PLUGIN_NAME)
+
+    @property
+    def __cache(self):
+        return getattr(self.__config, 'cache', None)
+
+    def record(self, item: Item, dependencies: Iterable[Dependency]):
+        """
+        Record the dependencies of a test declared at runtime, resolved
+        to the tests they refer to.
+        """
+        dependencies = tuple(dependencies)
+        depends = [
+            depend
+            for _, depend in item.resolve(*(
+                dependency
+                for dependency in dependencies
+                if isinstance(dependency, Dependency)
+            ))
+        ]
+        for requirement in item.require(*(
+                dependency
+                for dependency in dependencies
+                if isinstance(dependency, DependencyGroup)
+        )):
+            depends.extend(requirement.items)
+
+        nodeids = dict.fromkeys(
+            depend.pytest_item.nodeid
+            for depend in depends
+            if depend is not None and depend is not item
+        )
+        with self.__lock:
+            self.__observed.setdefault(item.pytest_item.nodeid, {}).update(nodeids)
+
+    def load(self, items: List[PytestItem]) -> Dict[PytestItem, Tuple[PytestItem, ...]]:
+        """
+        Read the dependencies learned in previous runs, prune the ones
+        that no longer exist, and return those between the items.
+        """
+        cache = self.__cache
+        if cache is None:
+            return {}
+
+        collected = {item.nodeid: item for item in items}
+        modules = self.__complete_modules(collected)
+
+        def exists(nodeid):
+            return nodeid in collected or nodeid.partition('::')[0] not in modules
+
+        edges = {}
+        for nodeid, depends in cache.get(self.CACHE_KEY, {}).items():
+            if not exists(nodeid):
+                continue
+            depends = [depend for depend in depends if exists(depend)]
+            if depends:
+                edges[nodeid] = depends
+        self.__edges = edges
+        self.__items = collected
+
+        return {
+            collected[nodeid]: tuple(
+                collected[depend]
+                for depend in depends
+                if depend in collected
+            )
+            for nodeid, depends in edges.items()
+            if nodeid in collected
+        }
+
+    def __complete_modules(self, collected) -> set:
+        """
+        The modules of which all tests are collected.
+        """
+        option = self.__config.option
+        if getattr(option, 'keyword', None) or getattr(option, 'markexpr', None):
+            return set()
+        modules = {nodeid.partition('::')[0] for nodeid in collected}
+        rootdir = str(self.__config.rootdir)
+        for arg in list(self.__config.args) + list(getattr(option, 'deselect', None) or ()):
+            path, sep, _ = str(arg).partition('::')
+            if sep:
+                path = os.path.relpath(os.path.abspath(path), rootdir)
+                modules.discard(path.replace(os.sep, '/'))
+        return modules
+
+    def pytest_sessionfinish(self):
+        cache = self.__cache
+        if cache is None:
+            return
+
+        edges = dict(self.__edges)
+        for nodeid in set(edges) | set(self.__observed):
+            item = self.__items.get(nodeid)
+            if item is None:
+                continue
+            item = Item.get(item)
+            if not isinstance(item, Item) or not item.status.started:
+                continue
+            # Dependencies on tests that were not collected could not
+            # be observed, keep them.
+            depends = list(dict.fromkeys(
+                list(self.__observed.get(nodeid, ()))
+                + [depend for depend in edges.get(nodeid, ()) if depend not in self.__items]
+            ))
+            if depends:
+                edges[nodeid] = depends
+            else:
+                edges.pop(nodeid, None)
+        cache.set(self.CACHE_KEY, edges)
@@ -1,10 +1,12 @@
 import sys
 
 from _pytest.nodes import Item as PytestItem
-from typing import Iterator, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from .config import conf
-from .dependency import Item, DependencyFinder
+from .dependency import Item, DependencyFinder, Requirement
+from .events import EventStream
+from .graph import DependencyGraph
 
 
 class TestOrganizer(Iterator[PytestItem]):
@@ -12,8 +14,18 @@ class TestOrganizer(Iterator[PytestItem]):
     STATUS_PUSHED = 1
     STATUS_WAITING = 2
 
-    def __init__(self, *items: PytestItem):
+    def __init__(
+            self,
+            *items: PytestItem,
+            learned: Optional[Dict[PytestItem, Tuple[PytestItem, ...]]] = None,
+    ):
+        """
+        `learned` maps items to the items they depended on at runtime in
+        previous runs, see :class:`pytest_dependency.learned.LearnedEdges`.
+        """
+        self.__position = 0
         self.__items = list(items)
+        self.__learned = learned or {}
         self.__statuses = {
             item: self.STATUS_NONE
             for item in items
@@ -30,16 +42,48 @@ class TestOrganizer(Iterator[PytestItem]):
         except DependencyFinder.DependencyNotFound:
             return False
 
+        for requirement in Item.get(item).requirements:
+            for depend in requirement.items:
+                status = self.__statuses.get(depend.pytest_item)
+                if status is not None and status != self.STATUS_PUSHED:
+                    return False
+
+        for depend in Item.get(item).after_items:
+            status = self.__statuses.get(depend.pytest_item)
+            if status is not None and status != self.STATUS_PUSHED:
+                return False
+
+        for depend in self.__learned.get(item, ()):
+            status = self.__statuses.get(depend)
+            if status is not None and status != self.STATUS_PUSHED:
+                return False
+
         return True
 
-    @staticmethod
-    def __has_unknown_dependency(item: PytestItem) -> bool:
+    def __present(self, requirement: Requirement) -> int:
+        """
+        The number of items of a group that are in the session.
+
+        A test depending on a group waits for these only, so it is
+        scheduled as soon as the group can be decided.
+        """
+        return sum(
+            1
+            for depend in requirement.items
+            if depend.pytest_item in self.__statuses
+        )
+
+    def __has_unknown_dependency(self, item: PytestItem) -> bool:
         try:
             tuple(Item.get(item).depend_items_setup())
         except DependencyFinder.DependencyNotFound:
             return True
-        else:
-            return False
+
+        for requirement in Item.get(item).requirements:
+            if self.__present(requirement) < requirement.count:
+                return True
+
+        return False
 
     def __remaining(self) -> Iterator[PytestItem]:
         for item in self.__items:
@@ -88,18 +132,66 @@ class TestOrganizer(Iterator[PytestItem]):
 
         item = self.__next_ready()
         if item is not None:
-            return item
+            return item, 'ready'
 
         item = self.__next_unknown()
         if item is not None:
             self.warn_unknown_dependency(item)
-            return item
+            return item, 'unknown'
 
         item = next(self.__remaining())
         self.warn_circular_dependency(item)
-        return item
+        return item, 'circular'
 
     def __next__(self) -> PytestItem:
-        item = self.__next()
+        item, reason = self.__next()
         self.__statuses[item] = self.STATUS_PUSHED
+        EventStream.emit(
+            EventStream.SCHEDULED,
+            nodeid=item.nodeid,
+            position=self.__position,
+            reason=reason,
+        )
+        self.__position += 1
         return item
+
+
+class OrderCheck(object):
+    """
+    Check that every test comes after its dependencies and the tests
+    it is to run after, without changing the order.
+    """
+
+    def __init__(self, *items: PytestItem):
+        graph = DependencyGraph(*items)
+        positions = {
+            item: position
+            for position, item in enumerate(items)
+        }
+        self.__violations = [
+            (item, depend)
+            for item in graph
+            for depend in dict.fromkeys(graph.prerequisites(item) + item.after_items)
+            if positions.get(depend.pytest_item, -1) > positions[item.pytest_item]
+        ]
+
+    @property
+    def violations(self) -> List[Tuple[Item, Item]]:
+        """
+        The pairs of a test and a dependency, or a test it is to run
+        after, that comes after it.
+        """
+        return self.__violations
+
+    def warn(self):
+        if not self.__violations:
+            return
+        print(
+            f"{len(self.__violations)} tests run before their dependencies:",
+            file=sys.stderr,
+        )
+        for item, depend in self.__violations:
+            print(
+                f"  {item.display_name} runs before {depend.display_name}",
+                file=sys.stderr,
+            )
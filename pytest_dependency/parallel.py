@@ -0,0 +1,428 @@
+import json
+import os
+import selectors
+import signal
+import struct
+import traceback
+
+import pytest
+from _pytest.nodes import Item as PytestItem
+from typing import Dict, List, Optional, Tuple
+
+from .dependency import Item
+from .events import EventStream
+from .graph import DependencyGraph
+from .shared import OutcomeTable
+from .summary import BlockedWork
+
+
+class Components(object):
+    """
+    The connected components of the dependency graph of a list of
+    items, each one in the order of the list.
+
+    Tests to be run after others, see the `after` argument of the
+    marker, are kept with these.  Tests without dependencies are
+    components of their own.  `learned`
+    adds the dependencies declared at runtime in previous runs, see
+    :class:`pytest_dependency.learned.LearnedEdges`.  `edges`, the
+    prerequisites of each item including all of these, such as those
+    read from a :class:`pytest_dependency.snapshot.GraphSnapshot`, is
+    used instead of resolving the dependencies if given.
+
+    Unless `resources` is false, all tests using a resource that some
+    test uses exclusively, see the `resources` and `exclusive` arguments
+    of the marker, are kept in one component as well, so that they never
+    overlap.  Resources only shared by their tests do not join them.
+    """
+
+    def __init__(self, items: List[PytestItem], learned=None, resources=True, edges=None):
+        self.__parent = {item: item for item in items}
+        self.__position = {item: i for i, item in enumerate(items)}
+        if edges is None:
+            graph = DependencyGraph(*items)
+            for item in graph:
+                for depend in graph.prerequisites(item) + item.after_items:
+                    if depend.pytest_item in self.__parent:
+                        self.__union(item.pytest_item, depend.pytest_item)
+            edges = learned or {}
+        for item, depends in edges.items():
+            for depend in depends:
+                if item in self.__parent and depend in self.__parent:
+                    self.__union(item, depend)
+
+        self.merged = {}
+        if resources:
+            self.__lock_resources(items)
+
+        components = {}
+        for item in items:
+            components.setdefault(self.__find(item), []).append(item)
+        self.__components = list(components.values())
+
+    def __lock_resources(self, items: List[PytestItem]):
+        """
+        Join the components of the users of each exclusive resource, and
+        record in `merged` how many components each one joined.
+        """
+        users = {}
+        exclusive = {}
+        for item in items:
+            depend = Item.get(item)
+            if not isinstance(depend, Item):
+                continue
+            for resource in depend.resources:
+                users.setdefault(resource, []).append(item)
+                if depend.exclusive:
+                    exclusive[resource] = None
+        for resource in exclusive:
+            first, *others = users[resource]
+            roots = {self.__find(item) for item in users[resource]}
+            if len(roots) > 1:
+                self.merged[resource] = len(roots)
+            for item in others:
+                self.__union(first, item)
+
+    def __find(self, item: PytestItem) -> PytestItem:
+        root = item
+        while self.__parent[root] is not root:
+            root = self.__parent[root]
+        while self.__parent[item] is not root:
+            self.__parent[item], item = root, self.__parent[item]
+        return root
+
+    def __union(self, a: PytestItem, b: PytestItem):
+        a, b = self.__find(a), self.__find(b)
+        if a is not b:
+            self.__parent[b] = a
+
+    def __iter__(self):
+        return iter(self.__components)
+
+    def __len__(self):
+        return len(self.__components)
+
+    def split(self, count: int, durations: Dict[str, float]) -> List[List[PytestItem]]:
+        """
+        Distribute the components over `count` workers, the longest
+        first, each to the worker having the least work so far.  The
+        durations of the tests are estimated from previous runs, tests
+        without timing count as the average.  The tests of each worker
+        are in the order of the list the components were built from.
+        """
+        workers, _ = self.__assign(count, durations)
+        return workers
+
+    def makespan(self, count: int, durations: Dict[str, float]) -> float:
+        """
+        The estimated time until the last of `count` workers is done.
+        """
+        _, loads = self.__assign(count, durations)
+        return max(loads)
+
+    def __assign(
+            self,
+            count: int,
+            durations: Dict[str, float],
+    ) -> Tuple[List[List[PytestItem]], List[float]]:
+        known = [duration for duration in durations.values() if duration]
+        default = sum(known) / len(known) if known else 1.0
+
+        def cost(component):
+            return sum(durations.get(item.nodeid) or default for item in component)
+
+        workers = [[] for _ in range(count)]
+        loads = [0.0] * count
+        for component in sorted(self.__components, key=cost, reverse=True):
+            index = loads.index(min(loads))
+            workers[index].extend(component)
+            loads[index] += cost(component)
+
+        # Each worker runs its tests in the order of the list, which the
+        # shared outcome table relies on to never wait for each other.
+        workers = [
+            sorted(items, key=self.__position.__getitem__)
+            for items in workers
+            if items
+        ]
+        return workers, loads
+
+
+class Channel(object):
+    """
+    Messages between a worker and the parent process through a pipe,
+    each one a JSON object prefixed by its length.
+    """
+
+    HEADER = struct.Struct('!I')
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.__buffer = b''
+
+    def send(self, message):
+        data = json.dumps(message).encode()
+        data = self.HEADER.pack(len(data)) + data
+        while data:
+            data = data[os.write(self.fd, data):]
+
+    def receive(self) -> Optional[List[dict]]:
+        """
+        Read what is available and return the complete messages, None
+        once the worker closed the pipe.
+        """
+        data = os.read(self.fd, 1 << 16)
+        if not data:
+            return None
+        self.__buffer += data
+        messages = []
+        while len(self.__buffer) >= self.HEADER.size:
+            size, = self.HEADER.unpack_from(self.__buffer)
+            end = self.HEADER.size + size
+            if len(self.__buffer) < end:
+                break
+            messages.append(json.loads(self.__buffer[self.HEADER.size:end]))
+            self.__buffer = self.__buffer[end:]
+        return messages
+
+
+class WorkerReporter(object):
+    """
+    Plugin in a worker, sending the reports of each test to the parent
+    once the test is finished.
+    """
+
+    PLUGIN_NAME = 'dependency-worker-reporter'
+
+    def __init__(self, config, channel: Channel):
+        self.__config = config
+        self.__channel = channel
+        self.__reports = []
+
+    def pytest_runtest_logreport(self, report):
+        self.__reports.append(self.__config.hook.pytest_report_to_serializable(
+            config=self.__config,
+            report=report,
+        ))
+
+    def pytest_runtest_logfinish(self, nodeid):
+        reports, self.__reports = self.__reports, []
+        self.__channel.send({'nodeid': nodeid, 'reports': reports})
+
+
+class Worker(object):
+    def __init__(self, pid, channel: Channel, items: List[PytestItem]):
+        self.pid = pid
+        self.channel = channel
+        self.items = {item.nodeid: item for item in items}
+        self.status = None
+
+    @property
+    def exit(self) -> str:
+        """
+        How the worker ended, from the wait status.
+        """
+        if os.WIFSIGNALED(self.status):
+            return f"was killed by signal {os.WTERMSIG(self.status)}"
+        if os.WIFEXITED(self.status):
+            return f"exited with exit code {os.WEXITSTATUS(self.status)}"
+        return f"ended with wait status {self.status}"
+
+
+class ParallelRunner(object):
+    """
+    Run the connected components of the dependency graph in forked
+    worker processes.
+
+    Each worker runs its tests in order in a single process, so a test
+    sees the outcomes of its dependencies as usual.  The reports are
+    sent to the parent, which logs them as if it had run the tests.
+    The outcomes are also published in an :class:`OutcomeTable`, from
+    which a worker reads those of the tests run by other workers that
+    a test depends on at runtime.
+    """
+
+    PLUGIN_NAME = 'dependency-workers'
+    TERMINAL_PLUGIN = 'terminalreporter'
+
+    def __init__(self, config, count: int, learned=None):
+        self.__config = config
+        self.__count = count
+        self.__learned = learned
+        self.edges = None
+        self.__cost = None
+
+    @classmethod
+    def setup(cls, config, count: Optional[int], learned=None):
+        """
+        Register the plugin if the tests are to be run by `count` workers.
+        """
+        if not count or count < 2:
+            return
+        if not hasattr(os, 'fork'):
+            raise pytest.UsageError("--dependency-workers requires os.fork()")
+        if not hasattr(config.hook, 'pytest_report_to_serializable'):
+            raise pytest.UsageError("--dependency-workers requires pytest >= 4.4")
+        config.pluginmanager.register(cls(config, count, learned), cls.PLUGIN_NAME)
+
+    @classmethod
+    def get(cls, config) -> Optional['ParallelRunner']:
+        return config.pluginmanager.get_plugin(cls.PLUGIN_NAME)
+
+    def __split(self, items: List[PytestItem]) -> List[List[PytestItem]]:
+        cache = getattr(self.__config, 'cache', None)
+        durations = cache.get(BlockedWork.CACHE_KEY, {}) if cache is not None else {}
+        components = Components(items, self.__learned, edges=self.edges)
+        if components.merged:
+            free = Components(items, self.__learned, resources=False, edges=self.edges)
+            self.__cost = (
+                components.merged,
+                components.makespan(self.__count, durations),
+                free.makespan(self.__count, durations),
+            )
+        return components.split(self.__count, durations)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """
+        Report how much the exclusive resources cost in estimated time,
+        compared to splitting the tests by their dependencies only.
+        """
+        if self.__cost is None:
+            return
+        merged, locked, free = self.__cost
+        terminalreporter.write_sep("=", "dependency workers")
+        for resource, count in merged.items():
+            terminalreporter.write_line(
+                f"exclusive resource {resource} joins {count} groups of tests"
+            )
+        increase = f" (+{(locked - free) / free:.0%})" if free else ""
+        terminalreporter.write_line(
+            f"estimated time {locked:.2f}s, {free:.2f}s without "
+            f"exclusive resources{increase}"
+        )
+
+    def __fork(self, session, items: List[PytestItem]) -> Worker:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(write_fd)
+            return Worker(pid, Channel(read_fd), items)
+
+        status = 1
+        try:
+            os.close(read_fd)
+            self.__run_worker(session, items, Channel(write_fd))
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    def __run_worker(self, session, items: List[PytestItem], channel: Channel):
+        EventStream.discard()
+        pluginmanager = self.__config.pluginmanager
+        terminal = pluginmanager.get_plugin(self.TERMINAL_PLUGIN)
+        if terminal is not None:
+            pluginmanager.unregister(terminal)
+        pluginmanager.register(
+            WorkerReporter(self.__config, channel),
+            WorkerReporter.PLUGIN_NAME,
+        )
+        for i, item in enumerate(items):
+            nextitem = items[i + 1] if i + 1 < len(items) else None
+            item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+            if session.shouldfail or session.shouldstop:
+                break
+
+    def __log(self, item: PytestItem, reports: List[dict]):
+        hook = item.ihook
+        hook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for data in reports:
+            # JSON turns the (path, lineno, reason) of skips into a list,
+            # the terminal reporter expects the tuple.
+            if isinstance(data.get('longrepr'), list):
+                data['longrepr'] = tuple(data['longrepr'])
+            report = self.__config.hook.pytest_report_from_serializable(
+                config=self.__config,
+                data=data,
+            )
+            depend = Item.get(item)
+            if isinstance(depend, Item):
+                depend.add_report(report)
+            hook.pytest_runtest_logreport(report=report)
+        hook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+
+    @staticmethod
+    def __stop(workers: List[Worker]):
+        for worker in workers:
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(
+                "%d error%s during collection"
+                % (session.testsfailed, "s" if session.testsfailed != 1 else "")
+            )
+
+        if session.config.option.collectonly:
+            return True
+
+        split = self.__split(session.items)
+        if len(split) < 2:
+            return None
+
+        table = OutcomeTable(session.items)
+        Item.share_outcomes(table)
+        try:
+            workers = [self.__fork(session, items) for items in split]
+            self.__wait(session, workers, table)
+        finally:
+            Item.share_outcomes(None)
+            table.close()
+
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+
+        lost = [worker for worker in workers if worker.status and worker.items]
+        if lost:
+            # Failed would end the session without showing the message.
+            raise session.Interrupted(", ".join(
+                f"worker {worker.pid} {worker.exit} "
+                f"before running {len(worker.items)} tests"
+                for worker in lost
+            ))
+        return True
+
+    def __wait(self, session, workers: List[Worker], table: OutcomeTable):
+        selector = selectors.DefaultSelector()
+        for worker in workers:
+            selector.register(worker.channel.fd, selectors.EVENT_READ, worker)
+
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    worker = key.data
+                    messages = worker.channel.receive()
+                    if messages is None:
+                        selector.unregister(worker.channel.fd)
+                        os.close(worker.channel.fd)
+                        # Do not leave the other workers waiting for
+                        # tests that will not be run.
+                        for item in worker.items.values():
+                            table.set(item, False)
+                        continue
+                    for message in messages:
+                        item = worker.items.pop(message['nodeid'])
+                        self.__log(item, message['reports'])
+                    if session.shouldfail or session.shouldstop:
+                        self.__stop(workers)
+        finally:
+            selector.close()
+            for worker in workers:
+                _, worker.status = os.waitpid(worker.pid, 0)
@@ -0,0 +1,711 @@
+import argparse
+import ast
+import fnmatch
+import heapq
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .constant import (
+    SCOPE_MODULE,
+    SCOPE_CLASS,
+    SCOPE_SESSION,
+    SCOPE_PACKAGE,
+    SCOPE_DIRECTORY,
+)
+
+
+PYTHON_FILES = ('test_*.py', '*_test.py')
+NORECURSE_DIRS = (
+    '*.egg', '.*', '_darcs', 'build', 'CVS', 'dist', 'node_modules', 'venv',
+    '{arch}', '__pycache__',
+)
+
+
+class StaticDependency(object):
+    """
+    A dependency read from the source, a single (scope, name) member or
+    a group of members at least `count` of which are required.
+    """
+
+    def __init__(self, members: Tuple[Tuple[str, str], ...], count: Optional[int] = None):
+        self.members = members
+        self.count = count
+
+    @property
+    def key(self):
+        return self.members, self.count
+
+    @property
+    def display_name(self):
+        if self.count is None:
+            return self.members[0][1]
+        names = ", ".join(name for _, name in self.members)
+        if self.count == 1:
+            return f"any of ({names})"
+        return f"at least {self.count} of ({names})"
+
+    def to_list(self):
+        return [[list(member) for member in self.members], self.count]
+
+    @classmethod
+    def from_list(cls, data) -> 'StaticDependency':
+        members, count = data
+        return cls(tuple(map(tuple, members)), count)
+
+
+class StaticTest(object):
+    """
+    A test function marked "dependency", as found in the source.
+
+    Parametrized tests are a single test here, the parameters are not
+    known without importing the module.
+    """
+
+    def __init__(self, path, cls, function, name, scope, depends, after, parametrized,
+                 match_params=False):
+        self.path = path
+        self.cls = cls
+        self.function = function
+        self.name = name
+        self.scope = scope
+        self.depends = depends
+        self.after = after
+        self.parametrized = parametrized
+        self.match_params = match_params
+
+    @property
+    def nodeid(self):
+        if self.cls:
+            return f"{self.path}::{self.cls}::{self.function}"
+        return f"{self.path}::{self.function}"
+
+    def get_name(self, scope):
+        """
+        The name of the test in a scope, the same as
+        :meth:`pytest_dependency.Item.get_name`.
+        """
+        if self.name:
+            return self.name
+        if scope == SCOPE_SESSION:
+            return self.nodeid
+        if scope == SCOPE_MODULE and self.cls:
+            return f"{self.cls}::{self.function}"
+        return self.function
+
+    def get_relative_name(self, base):
+        if self.name:
+            return self.name
+        _, _, rest = self.nodeid.partition('::')
+        return f"{posix_relpath(self.path, base)}::{rest}"
+
+    def to_list(self):
+        return [
+            self.path, self.cls, self.function, self.name, self.scope,
+            [dependency.to_list() for dependency in self.depends],
+            [dependency.to_list() for dependency in self.after],
+            self.parametrized,
+            self.match_params,
+        ]
+
+    @classmethod
+    def from_list(cls, data) -> 'StaticTest':
+        path, klass, function, name, scope, depends, after, parametrized, match_params = data
+        return cls(
+            path, klass, function, name, scope,
+            [StaticDependency.from_list(dependency) for dependency in depends],
+            [StaticDependency.from_list(dependency) for dependency in after],
+            parametrized, match_params,
+        )
+
+
+def posix_relpath(path, base):
+    if not base:
+        return path
+    return path[len(base) + 1:]
+
+
+def posix_dirname(path):
+    return path.rpartition('/')[0]
+
+
+class ModuleScanner(object):
+    """
+    Read the dependency markers of the tests in a module from its syntax
+    tree, without importing it.
+
+    Markers are recognized as decorators ending in `mark.dependency` and
+    in `pytestmark` assignments.  Arguments that are not literals are
+    left out.
+    """
+
+    MARKER = 'dependency'
+    PARAMETRIZE = 'parametrize'
+    GROUPS = {'any_of', 'at_least'}
+
+    def __init__(self, path):
+        self.path = path
+        self.errors = []
+
+    @classmethod
+    def scan(cls, args) -> Tuple[List[list], List[str]]:
+        """
+        Scan one file, given as (rootdir, path).  The result is plain
+        lists, to be cheap to send back from a worker process.
+        """
+        rootdir, path = args
+        scanner = cls(path)
+        try:
+            with open(os.path.join(rootdir, path), 'rb') as f:
+                tree = ast.parse(f.read(), path)
+        except (OSError, SyntaxError, ValueError) as e:
+            return [], [f"{path}: {e}"]
+        tests = [test.to_list() for test in scanner.tests(tree)]
+        return tests, scanner.errors
+
+    @staticmethod
+    def __mark_name(node) -> Optional[str]:
+        if isinstance(node, ast.Call):
+            node = node.func
+        if (isinstance(node, ast.Attribute)
+                and isinstance(node.value, ast.Attribute)
+                and node.value.attr == 'mark'):
+            return node.attr
+        if (isinstance(node, ast.Attribute)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == 'mark'):
+            return node.attr
+        return None
+
+    def __literal(self, node, default=None):
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            self.errors.append(
+                f"{self.path}:{node.lineno}: ignoring argument that is not a literal"
+            )
+            return default
+
+    @staticmethod
+    def __call_name(node) -> Optional[str]:
+        if not isinstance(node, ast.Call):
+            return None
+        if isinstance(node.func, ast.Name):
+            return node.func.id
+        if isinstance(node.func, ast.Attribute):
+            return node.func.attr
+        return None
+
+    @staticmethod
+    def __member(scope, value) -> Optional[Tuple[str, str]]:
+        if isinstance(value, str):
+            return scope, value
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            return tuple(value)
+        return None
+
+    def __depends(self, scope, node) -> Iterator[StaticDependency]:
+        if not isinstance(node, (ast.List, ast.Tuple)):
+            self.errors.append(f"{self.path}:{node.lineno}: ignoring depends")
+            return
+        for element in node.elts:
+            group = self.__call_name(element)
+            if group in self.GROUPS:
+                args = [self.__literal(arg) for arg in element.args]
+                if group == 'any_of':
+                    args.insert(0, 1)
+                members = [self.__member(scope, arg) for arg in args[1:]]
+                if args and isinstance(args[0], int) and None not in members:
+                    yield StaticDependency(tuple(members), args[0])
+                continue
+            member = self.__member(scope, self.__literal(element))
+            if member is not None:
+                yield StaticDependency((member,))
+
+    def __markers(self, nodes: Iterable) -> Tuple[List[dict], bool]:
+        markers = []
+        parametrized = False
+        for node in nodes:
+            name = self.__mark_name(node)
+            if name == self.PARAMETRIZE:
+                parametrized = True
+            if name != self.MARKER:
+                continue
+            kwargs = {}
+            if isinstance(node, ast.Call):
+                kwargs = {
+                    keyword.arg: keyword.value
+                    for keyword in node.keywords
+                    if keyword.arg
+                }
+            markers.append(kwargs)
+        return markers, parametrized
+
+    def __pytestmark(self, body) -> List[ast.AST]:
+        nodes = []
+        for node in body:
+            if not isinstance(node, ast.Assign):
+                continue
+            if not any(
+                    isinstance(target, ast.Name) and target.id == 'pytestmark'
+                    for target in node.targets
+            ):
+                continue
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                nodes.extend(node.value.elts)
+            else:
+                nodes.append(node.value)
+        return nodes
+
+    def __test(self, cls, function, *levels: List[dict]) -> Optional[StaticTest]:
+        """
+        Merge the markers of a test, closest first, like
+        :meth:`pytest_dependency.dependency.Marker.get`.
+        """
+        markers, parametrized = self.__markers(function.decorator_list)
+        found = bool(markers)
+        for level in levels:
+            found = found or bool(level)
+            markers.extend(level)
+        if not found:
+            return None
+
+        closest = markers[0]
+        name = self.__literal(closest['name']) if 'name' in closest else None
+        scope = self.__literal(closest['scope']) if 'scope' in closest else None
+        match_params = 'match_params' in closest and bool(self.__literal(closest['match_params']))
+        depends = {}
+        after = {}
+        for kwargs in markers:
+            marker_scope = None
+            if 'scope' in kwargs:
+                marker_scope = self.__literal(kwargs['scope'])
+            if 'depends' in kwargs:
+                for dependency in self.__depends(
+                        marker_scope or SCOPE_MODULE, kwargs['depends']):
+                    depends.setdefault(dependency.key, dependency)
+            if 'after' in kwargs:
+                for dependency in self.__depends(
+                        marker_scope or SCOPE_MODULE, kwargs['after']):
+                    after.setdefault(dependency.key, dependency)
+        return StaticTest(
+            self.path, cls, function.name, name, scope,
+            list(depends.values()), list(after.values()), parametrized,
+            match_params,
+        )
+
+    def tests(self, tree: ast.Module) -> Iterator[StaticTest]:
+        module_markers, _ = self.__markers(self.__pytestmark(tree.body))
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if node.name.startswith('test'):
+                    test = self.__test(None, node, module_markers)
+                    if test is not None:
+                        yield test
+            elif isinstance(node, ast.ClassDef) and node.name.startswith('Test'):
+                class_markers, _ = self.__markers(
+                    node.decorator_list + self.__pytestmark(node.body)
+                )
+                for method in node.body:
+                    if (isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef))
+                            and method.name.startswith('test')):
+                        test = self.__test(
+                            node.name, method, class_markers, module_markers,
+                        )
+                        if test is not None:
+                            yield test
+
+
+class StaticPlan(object):
+    """
+    The dependency graph of a test suite, built from the source alone.
+
+    The names are resolved as :class:`pytest_dependency.DependencyFinder`
+    does, and the order is the one of
+    :class:`pytest_dependency.TestOrganizer`, taking the `after` lists
+    into account.  Parametrized tests are planned as a single test, and
+    a dependency on one of their instances refers to that test.  A
+    dependency with `match_params` is assumed to match the parameters.
+    """
+
+    def __init__(self, tests: List[StaticTest], rootdir='.', errors=()):
+        self.__tests = tests
+        self.__rootdir = rootdir
+        self.errors = list(errors)
+        self.__packages = {}
+        self.__index = {}
+        for test in tests:
+            self.__register(test)
+
+        self.unresolved = []
+        self.__prerequisites = {}
+        self.__before = {}
+        self.__dependents = {test: [] for test in tests}
+        for test in tests:
+            prerequisites = {}
+            for dependency in test.depends:
+                for depend in self.__resolve(test, dependency):
+                    if depend is not test:
+                        prerequisites[depend] = None
+            self.__prerequisites[test] = tuple(prerequisites)
+            for dependency in test.after:
+                for scope, name in dependency.members:
+                    depend = self.find(test, scope, name)
+                    if depend is not None and depend is not test:
+                        prerequisites[depend] = None
+            self.__before[test] = tuple(prerequisites)
+            for depend in prerequisites:
+                self.__dependents[depend].append(test)
+
+    @classmethod
+    def scan(cls, paths: Iterable[str], rootdir='.', jobs: Optional[int] = None) -> 'StaticPlan':
+        """
+        Scan the test files below `paths`, in a pool of `jobs` processes.
+        """
+        rootdir = os.path.abspath(rootdir)
+        files = [
+            (rootdir, path)
+            for path in cls.find_files(paths, rootdir)
+        ]
+        if jobs == 1 or len(files) < 2:
+            results = map(ModuleScanner.scan, files)
+            return cls.__from_results(results, rootdir)
+        with ProcessPoolExecutor(jobs) as executor:
+            chunksize = max(1, len(files) // (4 * (jobs or os.cpu_count() or 1)))
+            results = executor.map(ModuleScanner.scan, files, chunksize=chunksize)
+            return cls.__from_results(results, rootdir)
+
+    @classmethod
+    def __from_results(cls, results, rootdir) -> 'StaticPlan':
+        tests = []
+        errors = []
+        for module_tests, module_errors in results:
+            tests.extend(map(StaticTest.from_list, module_tests))
+            errors.extend(module_errors)
+        return cls(tests, rootdir, errors)
+
+    @staticmethod
+    def find_files(paths: Iterable[str], rootdir) -> Iterator[str]:
+        """
+        The test modules below `paths`, relative to `rootdir`, with the
+        default `python_files` and `norecursedirs` of pytest.
+        """
+        for path in paths:
+            path = os.path.abspath(path)
+            if os.path.isfile(path):
+                yield os.path.relpath(path, rootdir).replace(os.sep, '/')
+                continue
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(
+                    name
+                    for name in dirnames
+                    if not any(fnmatch.fnmatch(name, p) for p in NORECURSE_DIRS)
+                )
+                for name in sorted(filenames):
+                    if any(fnmatch.fnmatch(name, p) for p in PYTHON_FILES):
+                        filename = os.path.join(dirpath, name)
+                        yield os.path.relpath(filename, rootdir).replace(os.sep, '/')
+
+    def __package(self, directory) -> Optional[str]:
+        """
+        The nearest directory having an `__init__.py`, up from `directory`.
+        """
+        try:
+            return self.__packages[directory]
+        except KeyError:
+            pass
+        init = os.path.join(self.__rootdir, directory, '__init__.py')
+        if os.path.isfile(init):
+            package = directory
+        elif directory:
+            package = self.__package(posix_dirname(directory))
+        else:
+            package = None
+        self.__packages[directory] = package
+        return package
+
+    def __add(self, key, name, test: StaticTest):
+        self.__index.setdefault(key, {}).setdefault(name, test)
+
+    def __register(self, test: StaticTest):
+        self.__add((SCOPE_SESSION,), test.get_name(SCOPE_SESSION), test)
+        self.__add((SCOPE_MODULE, test.path), test.get_name(SCOPE_MODULE), test)
+        if test.cls:
+            self.__add((SCOPE_CLASS, test.path, test.cls), test.get_name(SCOPE_CLASS), test)
+
+        # In the directory and package scopes, a test is found from the
+        # parent directories by its path relative to them, see
+        # DependencyFinder.find.
+        directory = posix_dirname(test.path)
+        name = test.get_relative_name(directory)
+        base = directory
+        while True:
+            relative = posix_relpath(directory, base)
+            self.__add(
+                (SCOPE_DIRECTORY, base),
+                f"{relative}/{name}" if relative else name,
+                test,
+            )
+            if not base:
+                break
+            base = posix_dirname(base)
+
+        package = self.__package(directory)
+        if package is None:
+            return
+        name = test.get_relative_name(package)
+        base = package
+        while base is not None:
+            relative = posix_relpath(package, base)
+            self.__add(
+                (SCOPE_PACKAGE, base),
+                f"{relative}/{name}" if relative else name,
+                test,
+            )
+            base = self.__package(posix_dirname(base)) if base else None
+
+    def __key(self, test: StaticTest, scope):
+        if scope == SCOPE_SESSION:
+            return (scope,)
+        if scope == SCOPE_MODULE:
+            return scope, test.path
+        if scope == SCOPE_CLASS:
+            return scope, test.path, test.cls
+        if scope == SCOPE_DIRECTORY:
+            return scope, posix_dirname(test.path)
+        if scope == SCOPE_PACKAGE:
+            return scope, self.__package(posix_dirname(test.path))
+        return None
+
+    def find(self, test: StaticTest, scope, name) -> Optional[StaticTest]:
+        """
+        The test a name refers to, as resolved at runtime.  The plain
+        name of a parametrized test only refers to the instances of a
+        test matching its parameters, see `match_params`.
+        """
+        names = self.__index.get(self.__key(test, scope), {})
+        found = names.get(name)
+        if test.match_params and test.parametrized:
+            if found is not None and found.parametrized:
+                return found
+            return None
+        if found is not None and found.parametrized:
+            return None
+        if found is None and name.endswith(']'):
+            found = names.get(name.partition('[')[0])
+            if found is not None and not found.parametrized:
+                found = None
+        return found
+
+    def __resolve(self, test: StaticTest, dependency: StaticDependency) -> List[StaticTest]:
+        found = []
+        for scope, name in dependency.members:
+            depend = self.find(test, scope, name)
+            if depend is not None:
+                found.append(depend)
+        if dependency.count is None:
+            if not found:
+                self.unresolved.append((test, dependency))
+        elif len(found) < dependency.count:
+            self.unresolved.append((test, dependency))
+        return found
+
+    def __iter__(self) -> Iterator[StaticTest]:
+        return iter(self.__tests)
+
+    def __len__(self):
+        return len(self.__tests)
+
+    def prerequisites(self, test: StaticTest) -> Tuple[StaticTest, ...]:
+        return self.__prerequisites[test]
+
+    def dependents(self, test: StaticTest) -> List[StaticTest]:
+        """
+        The tests depending on or to be run after `test`.
+        """
+        return self.__dependents[test]
+
+    def order(self) -> List[StaticTest]:
+        """
+        All tests in the order :class:`pytest_dependency.TestOrganizer`
+        runs them: the first test that is ready, then the first test
+        having unknown dependencies, then the first one on a cycle.
+        """
+        position = {test: index for index, test in enumerate(self.__tests)}
+        unknown = {test for test, _ in self.unresolved}
+        waiting = {
+            test: len(prerequisites)
+            for test, prerequisites in self.__before.items()
+        }
+        ready = [
+            (position[test], test)
+            for test in self.__tests
+            if not waiting[test] and test not in unknown
+        ]
+        heapq.heapify(ready)
+        done = set()
+        result = []
+        while len(result) < len(self.__tests):
+            if ready:
+                _, test = heapq.heappop(ready)
+            else:
+                remaining = [test for test in self.__tests if test not in done]
+                test = next(
+                    (test for test in remaining if test in unknown),
+                    remaining[0],
+                )
+            if test in done:
+                continue
+            done.add(test)
+            result.append(test)
+            for dependent in self.__dependents[test]:
+                waiting[dependent] -= 1
+                if not waiting[dependent] and dependent not in unknown:
+                    heapq.heappush(ready, (position[dependent], dependent))
+        return result
+
+    def components(self) -> List[List[StaticTest]]:
+        """
+        The groups of tests connected by dependencies, in plan order.
+        Different components may run on different workers.
+        """
+        order = self.order()
+        position = {test: index for index, test in enumerate(order)}
+        seen = set()
+        result = []
+        for test in order:
+            if test in seen:
+                continue
+            members = {test}
+            queue = deque(members)
+            while queue:
+                current = queue.popleft()
+                for other in self.__before[current] + tuple(self.__dependents[current]):
+                    if other not in members:
+                        members.add(other)
+                        queue.append(other)
+            seen.update(members)
+            result.append(sorted(members, key=position.__getitem__))
+        return result
+
+    def cycles(self) -> List[List[StaticTest]]:
+        """
+        The strongly connected components having more than one test, found
+        with an iterative version of Tarjan's algorithm.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        result = []
+        for root in self.__tests:
+            if root in index:
+                continue
+            work = [(root, iter(self.__before[root]))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                test, edges = work[-1]
+                for depend in edges:
+                    if depend not in index:
+                        index[depend] = lowlink[depend] = len(index)
+                        stack.append(depend)
+                        on_stack.add(depend)
+                        work.append((depend, iter(self.__before[depend])))
+                        break
+                    if depend in on_stack:
+                        lowlink[test] = min(lowlink[test], index[depend])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[test])
+                    if lowlink[test] == index[test]:
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            members.append(member)
+                            if member is test:
+                                break
+                        if len(members) > 1:
+                            result.append(members[::-1])
+        return result
+
+    def to_dict(self) -> Dict[str, list]:
+        return {
+            'order': [test.nodeid for test in self.order()],
+            'components': [
+                [test.nodeid for test in members]
+                for members in self.components()
+            ],
+            'unresolved': [
+                {'nodeid': test.nodeid, 'dependency': dependency.display_name}
+                for test, dependency in self.unresolved
+            ],
+            'cycles': [
+                [test.nodeid for test in members]
+                for members in self.cycles()
+            ],
+            'errors': self.errors,
+        }
+
+    def write(self, out):
+        data = self.to_dict()
+        out.write("order:\n")
+        for nodeid in data['order']:
+            out.write(f"  {nodeid}\n")
+        out.write(f"components: {len(data['components'])}\n")
+        for number, members in enumerate(data['components'], 1):
+            out.write(f"  {number}: {len(members)} tests\n")
+            for nodeid in members:
+                out.write(f"    {nodeid}\n")
+        if data['unresolved']:
+            out.write("unresolved:\n")
+            for entry in data['unresolved']:
+                out.write(f"  {entry['nodeid']} depends on {entry['dependency']}\n")
+        if data['cycles']:
+            out.write("cycles:\n")
+            for members in data['cycles']:
+                out.write(f"  {' -> '.join(members + members[:1])}\n")
+        for error in data['errors']:
+            out.write(f"warning: {error}\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m pytest_dependency',
+        description="Tools for test dependencies.",
+    )
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    plan = commands.add_parser(
+        'plan',
+        help="plan the tests from the source, without importing it",
+        description=(
+            "Read the dependency markers of the test modules and print the "
+            "order, the connected components, the unresolved dependencies "
+            "and the cycles.  Exit with status 1 if there are unresolved "
+            "dependencies or cycles."
+        ),
+    )
+    plan.add_argument('paths', nargs='*', default=['.'])
+    plan.add_argument('--rootdir', default='.',
+                      help="directory the test names are relative to")
+    plan.add_argument('--jobs', '-j', type=int, default=None,
+                      help="number of processes scanning the files")
+    plan.add_argument('--json', action='store_true',
+                      help="write the plan as JSON")
+    args = parser.parse_args(argv)
+
+    result = StaticPlan.scan(args.paths, args.rootdir, args.jobs)
+    if args.json:
+        json.dump(result.to_dict(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        result.write(sys.stdout)
+    return 1 if result.unresolved or result.cycles() else 0
@@ -0,0 +1,70 @@
+import pytest
+from _pytest.nodes import Item as PytestItem
+from _pytest.runner import runtestprotocol
+from typing import List
+
+from .config import conf
+from .graph import DependencyGraph
+
+
+class PrerequisiteRetry(object):
+    """
+    Run failing prerequisites again before their dependents are checked.
+
+    The test is retried in place, right after it failed.  Only the
+    reports of the last attempt are logged, and the outcome registered
+    for the dependents is the one of the last attempt.  The number of
+    retries is taken from the `retries` argument of the marker or, for
+    tests having dependents, from the default set on the command line.
+    """
+
+    PLUGIN_NAME = 'dependency-retry'
+
+    def __init__(self, graph: DependencyGraph, default: int = 0):
+        self.__retries = {}
+        self.__attempts = {}
+        for item in graph:
+            retries = item.marker.retries if item.marker is not None else None
+            if retries is None:
+                if not graph.dependents(item):
+                    continue
+                retries = default
+            if retries > 0:
+                self.__retries[item.pytest_item] = int(retries)
+
+    def __len__(self):
+        return len(self.__retries)
+
+    @classmethod
+    def setup(cls, config, items: List[PytestItem]):
+        """
+        Register the plugin if any test is to be retried.
+        """
+        plugin = cls(DependencyGraph(*items), conf.retries)
+        if plugin:
+            config.pluginmanager.register(plugin, cls.PLUGIN_NAME)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item: PytestItem, nextitem):
+        retries = self.__retries.get(item)
+        if not retries:
+            return None
+
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for attempt in range(retries + 1):
+            reports = runtestprotocol(item, nextitem=nextitem, log=False)
+            if not any(report.failed for report in reports):
+                break
+        if attempt:
+            self.__attempts[item] = attempt + 1
+        for report in reports:
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.__attempts:
+            return
+        terminalreporter.write_sep("=", "retried dependencies")
+        for item, attempts in self.__attempts.items():
+            terminalreporter.write_line(f"{item.nodeid}: {attempts} attempts")
@@ -0,0 +1,27 @@
+"""
+Hooks called for each test.
+
+These are registered as a plugin on their own, so that they can be
+dropped if no test in the session is marked.
+"""
+import pytest
+
+from .dependency import Item
+
+PLUGIN_NAME = 'dependency-runtest'
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Store the test outcome if this item is marked "dependency".
+    """
+    yield from Item.get(item).pytest_runtest_makereport()
+
+
+def pytest_runtest_setup(item):
+    """
+    Check dependencies if this item is marked "dependency".
+    Skip if any of the dependencies has not been run successfully.
+    """
+    return Item.get(item).check_skip()
@@ -0,0 +1,78 @@
+import mmap
+import time
+
+from _pytest.nodes import Item as PytestItem
+from typing import Iterable, Optional
+
+
+class OutcomeTable(object):
+    """
+    The outcomes of the tests of a session, one byte per test, in memory
+    shared with the processes forked after the table is created.
+
+    The tests are numbered in the order of the session, which is the
+    order they are run in.  A process reads the outcome of a test run
+    by another process directly, without asking the parent.  Each byte
+    is only written by the process running the test, once its outcome
+    is known.
+    """
+
+    PENDING = 0
+    PASSED = 1
+    FAILED = 2
+
+    POLL_INTERVAL = 0.0005
+    POLL_MAX_INTERVAL = 0.05
+
+    def __init__(self, items: Iterable[PytestItem]):
+        self.__index = {item: i for i, item in enumerate(items)}
+        # An anonymous mapping is shared, not copied, by forked children.
+        self.__memory = mmap.mmap(-1, max(len(self.__index), 1))
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __contains__(self, item: PytestItem):
+        return item in self.__index
+
+    def close(self):
+        self.__memory.close()
+
+    def set(self, item: PytestItem, result: Optional[bool]):
+        index = self.__index.get(item)
+        if index is None:
+            return
+        if result is None:
+            self.__memory[index] = self.PENDING
+        else:
+            self.__memory[index] = self.PASSED if result else self.FAILED
+
+    def get(self, item: PytestItem) -> Optional[bool]:
+        """
+        True if the test passed, False if it did not, None while the
+        outcome is pending or if the test is not in the table.
+        """
+        index = self.__index.get(item)
+        if index is None:
+            return None
+        value = self.__memory[index]
+        if value == self.PENDING:
+            return None
+        return value == self.PASSED
+
+    def wait(self, item: PytestItem, before: PytestItem) -> Optional[bool]:
+        """
+        The outcome of `item`, waiting for it if it comes before the
+        test `before` in the session.  Each process runs its tests in
+        the order of the session, so the first pending test of all
+        processes never waits and the processes cannot block each other.
+        """
+        index = self.__index.get(item)
+        position = self.__index.get(before)
+        if index is None or position is None or index >= position:
+            return self.get(item)
+        interval = self.POLL_INTERVAL
+        while self.__memory[index] == self.PENDING:
+            time.sleep(interval)
+            interval = min(2 * interval, self.POLL_MAX_INTERVAL)
+        return self.get(item)
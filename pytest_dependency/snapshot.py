@@ -0,0 +1,233 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from _pytest.nodes import Item as PytestItem
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import conf
+from .dependency import Dependency, DependencyGroup
+from .graph import DependencyGraph
+from .learned import LearnedEdges
+from .order import TestOrganizer
+
+
+class GraphSnapshot(object):
+    """
+    The resolved dependency graph and the order of a collection, in a
+    compact binary file that is read with :mod:`mmap`.
+
+    The tests are numbered in collection order.  The file has a header,
+    the run order as test numbers, the prerequisites of each test as
+    compressed sparse rows, i.e. an array of offsets into an array of
+    test numbers, and a string table of the node ids.  All numbers are
+    32 bit unsigned integers in the byte order of the machine.
+
+    The header includes a hash of the inputs of the graph, i.e. the node
+    ids, the arguments of the markers and the dependencies learned in
+    previous runs, so that a process can check that the file matches its
+    own collection before using the order and the edges rather than
+    resolving the dependencies and computing them.
+    """
+
+    MAGIC = b'PDG1'
+    BYTE_ORDER = 0x01020304
+    HEADER = struct.Struct('=4s4I32s')
+
+    def __init__(self, data: mmap.mmap):
+        self.__data = data
+        magic, byte_order, nodes, edges, strings, digest = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or byte_order != self.BYTE_ORDER:
+            raise ValueError("not a dependency graph snapshot")
+        self.digest = digest
+        self.__nodes = nodes
+
+        view = memoryview(data)
+        offset = self.HEADER.size
+        sections = []
+        for count in (nodes, nodes + 1, edges, nodes + 1):
+            end = offset + 4 * count
+            sections.append(view[offset:end].cast('I'))
+            offset = end
+        self.__order, self.__offsets, self.__targets, self.__string_offsets = sections
+        self.__strings = view[offset:offset + strings]
+        if len(self.__strings) != strings:
+            raise ValueError("truncated dependency graph snapshot")
+
+    @classmethod
+    def open(cls, path) -> Optional['GraphSnapshot']:
+        """
+        Map the file read-only, None if it does not exist or is not a
+        valid snapshot.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return cls(data)
+        except (ValueError, struct.error, TypeError):
+            data.close()
+            return None
+
+    def close(self):
+        # The views must be released before the map can be closed.
+        for view in (
+                self.__order, self.__offsets, self.__targets,
+                self.__string_offsets, self.__strings,
+        ):
+            view.release()
+        self.__data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.__nodes
+
+    def order(self) -> List[int]:
+        return self.__order.tolist()
+
+    def prerequisites(self, index: int) -> List[int]:
+        return self.__targets[self.__offsets[index]:self.__offsets[index + 1]].tolist()
+
+    def nodeid(self, index: int) -> str:
+        start = self.__string_offsets[index]
+        end = self.__string_offsets[index + 1]
+        return bytes(self.__strings[start:end]).decode()
+
+    @staticmethod
+    def edges(
+            items: Sequence[PytestItem],
+            learned: Optional[Dict[PytestItem, Tuple[PytestItem, ...]]] = None,
+    ) -> List[List[int]]:
+        """
+        The prerequisites of each item as item numbers, including the
+        tests to run before it and the ones learned at runtime.
+        """
+        index = {item: i for i, item in enumerate(items)}
+        edges = [[] for _ in items]
+        graph = DependencyGraph(*items)
+        for item in graph:
+            edges[index[item.pytest_item]].extend(
+                index[depend.pytest_item]
+                for depend in graph.prerequisites(item) + item.after_items
+                if depend.pytest_item in index
+            )
+        for item, depends in (learned or {}).items():
+            if item in index:
+                edges[index[item]].extend(
+                    index[depend]
+                    for depend in depends
+                    if depend in index
+                )
+        return edges
+
+    @classmethod
+    def __canonical(cls, value):
+        if isinstance(value, (list, tuple)):
+            return [cls.__canonical(v) for v in value]
+        if isinstance(value, DependencyGroup):
+            return ['group', value.count, cls.__canonical(value.dependencies)]
+        if isinstance(value, Dependency):
+            return ['dependency', value.scope, value.name, value.param_id]
+        return repr(value)
+
+    @classmethod
+    def digest(cls, items: Sequence[PytestItem], learned: dict) -> bytes:
+        """
+        The hash of the inputs of the graph, cheap to compute before any
+        dependency is resolved.  `learned` is the cache entry of
+        :class:`pytest_dependency.learned.LearnedEdges`.
+        """
+        sha = hashlib.sha256(cls.MAGIC)
+        sha.update(repr(conf.auto_mark).encode())
+        for item in items:
+            markers = [
+                [cls.__canonical(marker.args), sorted(
+                    (key, cls.__canonical(value))
+                    for key, value in marker.kwargs.items()
+                )]
+                for marker in item.iter_markers(Dependency.MARKER)
+            ]
+            sha.update(item.nodeid.encode())
+            sha.update(b'\0')
+            sha.update(json.dumps(markers).encode())
+            sha.update(b'\n')
+        sha.update(json.dumps(learned, sort_keys=True).encode())
+        return sha.digest()
+
+    @classmethod
+    def write(cls, path, items: Sequence[PytestItem], order: Sequence[PytestItem],
+              edges: List[List[int]], digest: bytes):
+        """
+        Write a snapshot, replacing the file atomically so that readers
+        never see a partial file.
+        """
+        index = {item: i for i, item in enumerate(items)}
+        offsets = array('I', [0])
+        targets = array('I')
+        for depends in edges:
+            targets.extend(depends)
+            offsets.append(len(targets))
+        strings = bytearray()
+        string_offsets = array('I', [0])
+        for item in items:
+            strings += item.nodeid.encode()
+            string_offsets.append(len(strings))
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(cls.HEADER.pack(
+                cls.MAGIC, cls.BYTE_ORDER,
+                len(items), len(targets), len(strings), digest,
+            ))
+            f.write(array('I', (index[item] for item in order)).tobytes())
+            f.write(offsets.tobytes())
+            f.write(targets.tobytes())
+            f.write(string_offsets.tobytes())
+            f.write(strings)
+        os.replace(tmp, path)
+
+    @classmethod
+    def reorder(
+            cls,
+            config,
+            path,
+            items: List[PytestItem],
+            learned: Optional[Dict[PytestItem, Tuple[PytestItem, ...]]] = None,
+    ) -> Tuple[List[PytestItem], Dict[PytestItem, Tuple[PytestItem, ...]]]:
+        """
+        The items and their prerequisites, in the order of the snapshot
+        in `path` if it matches them, otherwise in the order of
+        :class:`TestOrganizer`, which is then written to `path`.
+
+        Only the controller writes the snapshot, not the workers of
+        pytest-xdist, which collect the same tests.
+        """
+        cache = getattr(config, 'cache', None)
+        digest = cls.digest(items, cache.get(LearnedEdges.CACHE_KEY, {}) if cache else {})
+        snapshot = cls.open(path)
+        if snapshot is not None:
+            with snapshot:
+                if snapshot.digest == digest and len(snapshot) == len(items):
+                    return [items[i] for i in snapshot.order()], {
+                        item: tuple(items[j] for j in snapshot.prerequisites(i))
+                        for i, item in enumerate(items)
+                    }
+
+        edges = cls.edges(items, learned)
+        order = list(TestOrganizer(*items, learned=learned))
+        if not hasattr(config, 'workerinput'):
+            cls.write(path, items, order, edges, digest)
+        return order, {
+            item: tuple(items[j] for j in depends)
+            for item, depends in zip(items, edges)
+        }
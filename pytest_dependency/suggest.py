@@ -0,0 +1,132 @@
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+from typing import Iterable, List
+
+from .dependency import Dependency, DependencyFinder, Item
+
+
+class NameIndex(object):
+    """
+    Trigram index of names, to find the names close to a misspelled one.
+
+    The candidates are the names sharing the most trigrams with the
+    name looked for, ranked by their similarity.  Trigrams common to
+    most names, such as those of `test_`, are left out of the counts.
+    """
+
+    SIZE = 3
+    CANDIDATES = 50
+    CUTOFF = 0.8
+
+    def __init__(self, names: Iterable[str]):
+        self.__names = list(names)
+        self.__postings = defaultdict(list)
+        for number, name in enumerate(self.__names):
+            for gram in self.grams(name):
+                self.__postings[gram].append(number)
+        self.__common = len(self.__names) // 2
+
+    def __len__(self):
+        return len(self.__names)
+
+    @classmethod
+    def grams(cls, name: str) -> set:
+        padded = f"^{name}$"
+        return {
+            padded[i:i + cls.SIZE]
+            for i in range(len(padded) - cls.SIZE + 1)
+        }
+
+    def similar(self, name: str, limit: int = 3) -> List[str]:
+        postings = [
+            self.__postings[gram]
+            for gram in self.grams(name)
+            if gram in self.__postings
+        ]
+        rare = [numbers for numbers in postings if len(numbers) <= self.__common]
+        counts = Counter()
+        for numbers in rare or postings:
+            counts.update(numbers)
+
+        scored = []
+        for number, _ in counts.most_common(self.CANDIDATES):
+            candidate = self.__names[number]
+            ratio = SequenceMatcher(None, name, candidate).ratio()
+            if ratio >= self.CUTOFF and candidate != name:
+                scored.append((-ratio, candidate))
+        scored.sort()
+        return [candidate for _, candidate in scored[:limit]]
+
+
+class UnknownDependencies(object):
+    """
+    Collect the dependencies that could not be resolved, with hints on
+    the names that were probably meant, for the terminal summary.
+
+    The hints are only looked for when a test is skipped for an unknown
+    dependency, resolving known names costs nothing extra.
+    """
+
+    PLUGIN_NAME = 'dependency-unknown'
+
+    def __init__(self):
+        self.__entries = []
+
+    @classmethod
+    def record(cls, item: Item, dependency: Dependency):
+        plugin = item.pytest_item.config.pluginmanager.get_plugin(cls.PLUGIN_NAME)
+        if plugin is not None:
+            plugin.add(item, dependency)
+
+    @staticmethod
+    def hints(item: Item, dependency: Dependency) -> List[str]:
+        """
+        Where the name exists in other scopes, and the close names in
+        the scope of the dependency, or in the other scopes if there
+        are none.
+        """
+        hints = []
+        close = []
+        for scope in DependencyFinder.SCOPE_CLASSES:
+            try:
+                finder = DependencyFinder.get(item, scope)
+            except DependencyFinder.InvalidNode:
+                continue
+            if scope == dependency.scope:
+                close[:0] = [(None, name) for name in finder.similar(dependency.display_name, item)]
+                continue
+            try:
+                finder.find(Dependency(scope, dependency.name, dependency.param_id))
+            except DependencyFinder.DependencyNotFound:
+                close.extend(
+                    (scope, name)
+                    for name in finder.similar(dependency.display_name, item)
+                )
+            else:
+                hints.append(f"{dependency.display_name} exists in {scope} scope")
+
+        in_scope = [name for scope, name in close if scope is None]
+        if in_scope:
+            hints.extend(f"did you mean {name}?" for name in in_scope)
+        elif not hints:
+            hints.extend(
+                f"did you mean {name} in {scope} scope?"
+                for scope, name in dict.fromkeys(close)
+            )
+        return hints
+
+    def add(self, item: Item, dependency: Dependency):
+        self.__entries.append((item, dependency, self.hints(item, dependency)))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.__entries:
+            return
+        terminalreporter.write_sep("=", "unknown dependencies")
+        for item, dependency, hints in self.__entries:
+            terminalreporter.write_line(
+                f"{item.display_name} depends on {dependency.display_name}, "
+                f"which does not exist"
+            )
+            for hint in hints:
+                terminalreporter.write_line(f"  {hint}")
@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from _pytest.nodes import Item as PytestItem
+from typing import Dict, List, Optional
+
+from .config import conf
+from .dependency import Item
+from .graph import DependencyGraph
+
+
+class Blocker(object):
+    """
+    A prerequisite that did not pass and the dependents it blocked.
+    """
+
+    def __init__(self, item: Item):
+        self.item = item
+        self.blocked = []
+        self.duration = 0.0
+        self.unknown = 0
+
+    def add(self, item: Item, duration: Optional[float]):
+        self.blocked.append(item)
+        if duration is None:
+            self.unknown += 1
+        else:
+            self.duration += duration
+
+    @property
+    def nodeid(self):
+        return self.item.pytest_item.nodeid
+
+    def to_dict(self):
+        return {
+            'nodeid': self.nodeid,
+            'name': self.item.display_name,
+            'blocked': len(self.blocked),
+            'estimated_duration': self.duration,
+            'unknown_duration': self.unknown,
+            'dependents': [
+                item.pytest_item.nodeid
+                for item in self.blocked
+            ],
+        }
+
+    def __str__(self):
+        s = (
+            f"{self.nodeid} blocked {len(self.blocked)} tests, "
+            f"estimated {self.duration:.2f}s"
+        )
+        if self.unknown:
+            s += f" ({self.unknown} without timing)"
+        return s
+
+
+class BlockedWork(object):
+    """
+    Rank the prerequisites that did not pass by the work they blocked.
+
+    The time the blocked tests would have taken is estimated from the
+    durations recorded in the cache by previous runs.
+    """
+
+    PLUGIN_NAME = 'dependency-blocked-work'
+    CACHE_KEY = 'dependency/durations'
+
+    def __init__(self, config):
+        self.__config = config
+        self.__graph = None
+        self.__ranking = []
+
+    @property
+    def ranking(self) -> List[Blocker]:
+        return self.__ranking
+
+    def __load_durations(self) -> Dict[str, float]:
+        cache = getattr(self.__config, 'cache', None)
+        if cache is None:
+            return {}
+        return cache.get(self.CACHE_KEY, {})
+
+    def __save_durations(self, durations: Dict[str, float]):
+        cache = getattr(self.__config, 'cache', None)
+        if cache is None:
+            return
+        cache.set(self.CACHE_KEY, durations)
+
+    @staticmethod
+    def rank(graph: DependencyGraph, durations: Dict[str, float]) -> List[Blocker]:
+        """
+        Find the root failures and their transitive dependents.
+
+        This is a single pass over the graph in topological order.  The
+        roots blocking an item are kept as a bit set, the union of the
+        bit sets of its prerequisites.
+        """
+        roots = []
+        blockers = {}
+        for item in graph.topological():
+            if not item.status.started or item.passed:
+                continue
+
+            # A test that ran and did not pass is a root, even if some of
+            # its prerequisites were blocked, e.g. members of a group.
+            if item.status.called or item.status.failed:
+                blockers[item] = 1 << len(roots)
+                roots.append(Blocker(item))
+                continue
+
+            mask = 0
+            for depend in graph.prerequisites(item):
+                mask |= blockers.get(depend, 0)
+            if not mask:
+                # Skipped for another reason, e.g. unknown dependencies.
+                continue
+
+            blockers[item] = mask
+            duration = durations.get(item.pytest_item.nodeid)
+            while mask:
+                bit = mask & -mask
+                roots[bit.bit_length() - 1].add(item, duration)
+                mask ^= bit
+
+        return sorted(
+            (root for root in roots if root.blocked),
+            key=lambda root: (-len(root.blocked), -root.duration),
+        )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[PytestItem]):
+        self.__graph = DependencyGraph(*items)
+
+    def pytest_sessionfinish(self):
+        if self.__graph is None:
+            return
+
+        durations = self.__load_durations()
+        self.__ranking = self.rank(self.__graph, durations)
+
+        for item in self.__graph:
+            if item.status.called:
+                durations[item.pytest_item.nodeid] = item.status.duration
+        self.__save_durations(durations)
+
+        if conf.summary_json:
+            with open(conf.summary_json, 'w') as f:
+                json.dump(
+                    {'blocked': [root.to_dict() for root in self.__ranking]},
+                    f,
+                    indent=2,
+                )
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.__ranking:
+            return
+        terminalreporter.write_sep("=", "blocked by failed dependencies")
+        for root in self.__ranking:
+            terminalreporter.write_line(str(root))
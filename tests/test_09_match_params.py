@@ -0,0 +1,79 @@
+"""
+Depend on the instance of a parametrized test with the same parameters.
+"""
+
+
+def test_match_params(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        @pytest.mark.dependency(depends=["test_b"], match_params=True)
+        def test_a(x):
+            pass
+
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        @pytest.mark.dependency()
+        def test_b(x):
+            assert x != 2
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=4, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_b?1? PASSED
+        *::test_a?1? PASSED
+        *::test_b?2? FAILED
+        *::test_a?2? SKIPPED
+        *::test_b?3? PASSED
+        *::test_a?3? PASSED
+    """)
+
+
+def test_match_params_fixture(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.fixture(scope="module", params=range(1, 4))
+        def testcase(request):
+            return request.param
+
+        @pytest.mark.dependency()
+        def test_a(testcase):
+            assert testcase != 2
+
+        class TestClass(object):
+            @pytest.mark.dependency(depends=["test_a"], match_params=True)
+            def test_b(self, testcase):
+                pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=4, skipped=1, failed=1)
+    result.stdout.fnmatch_lines_random("""
+        *::test_a?2? FAILED
+        *::TestClass::test_b?1? PASSED
+        *::TestClass::test_b?2? SKIPPED
+        *::TestClass::test_b?3? PASSED
+    """)
+
+
+def test_match_params_missing(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.parametrize("x", [1, 2])
+        @pytest.mark.dependency()
+        def test_a(x):
+            pass
+
+        @pytest.mark.parametrize("x", [1, 3])
+        @pytest.mark.dependency(depends=["test_a"], match_params=True)
+        def test_b(x):
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "-rs")
+    result.assert_outcomes(passed=3, skipped=1)
+    result.stdout.fnmatch_lines_random("""
+        *::test_b?1? PASSED
+        *::test_b?3? SKIPPED
+        *test_b?3? depends on test_a?3?, which does not exist
+    """)
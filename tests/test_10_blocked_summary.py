@@ -0,0 +1,136 @@
+"""
+Rank the failed dependencies by the tests they blocked.
+"""
+
+import json
+
+
+def test_blocked_summary(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency()
+        def test_b():
+            pytest.skip("explicit skip")
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=["test_c", "test_b"])
+        def test_d():
+            pass
+
+        @pytest.mark.dependency(depends=["test_d"])
+        def test_e():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose",
+                                "--dependency-summary-json=summary.json")
+    result.assert_outcomes(passed=0, skipped=4, failed=1)
+    result.stdout.fnmatch_lines("""
+        *= blocked by failed dependencies =*
+        *::test_a blocked 3 tests, estimated 0.00s (3 without timing)
+        *::test_b blocked 2 tests, estimated 0.00s (2 without timing)
+    """)
+    with open(str(ctestdir.tmpdir.join("summary.json"))) as f:
+        summary = json.load(f)
+    blocked = summary["blocked"]
+    assert [b["name"] for b in blocked] == ["test_a", "test_b"]
+    assert [b["blocked"] for b in blocked] == [3, 2]
+    assert blocked[1]["dependents"] == [
+        "test_blocked_summary.py::test_d",
+        "test_blocked_summary.py::test_e",
+    ]
+
+
+def test_blocked_estimated_duration(ctestdir):
+    ctestdir.makepyfile("""
+        import os
+        import time
+        import pytest
+
+        FAIL = os.environ.get("FAIL_A") == "1"
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert not FAIL
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            time.sleep(0.2)
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=2)
+    result.stdout.no_fnmatch_line("*blocked by failed dependencies*")
+
+    ctestdir.monkeypatch.setenv("FAIL_A", "1")
+    result = ctestdir.runpytest()
+    result.assert_outcomes(skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a blocked 1 tests, estimated 0.2?s
+    """)
+
+
+def test_unknown_not_a_root(ctestdir):
+    """
+    A test skipped for an unknown dependency did not fail, the tests
+    depending on it are not reported as blocked by it.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(depends=['test_b'])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=['test_c'])
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(skipped=2)
+    assert "blocked by failed dependencies" not in result.stdout.str()
+
+
+def test_failed_with_blocked_group_member(ctestdir):
+    """
+    A test that ran and failed is a root, even if a member of a group it
+    depends on was blocked, and is not counted as blocked work.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=[any_of("test_b", "test_c")])
+        def test_d():
+            assert False
+
+        @pytest.mark.dependency(depends=["test_d"])
+        def test_e():
+            pass
+    """)
+    result = ctestdir.runpytest("--dependency-summary-json=summary.json")
+    result.assert_outcomes(passed=1, skipped=2, failed=2)
+    with open(str(ctestdir.tmpdir.join("summary.json"))) as f:
+        blocked = json.load(f)["blocked"]
+    assert {b["name"]: b["dependents"] for b in blocked} == {
+        "test_a": ["test_failed_with_blocked_group_member.py::test_b"],
+        "test_d": ["test_failed_with_blocked_group_member.py::test_e"],
+    }
@@ -0,0 +1,64 @@
+"""
+Select the tests affected by changed test modules.
+"""
+
+
+def test_changed(ctestdir):
+    test_a = """
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """
+    test_b = """
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(scope="session", depends=[
+            "test_a.py::test_a",
+            "test_b.py::test_c",
+        ])
+        def test_d():
+            pass
+    """
+    test_c = """
+        import pytest
+
+        @pytest.mark.dependency(scope="session", depends=["test_b.py::test_d"])
+        def test_e():
+            pass
+
+        def test_f():
+            pass
+    """
+    ctestdir.makepyfile(test_a=test_a, test_b=test_b, test_c=test_c)
+    ctestdir.makefile(".txt", changed="test_b.py\n")
+
+    result = ctestdir.runpytest("--verbose", "--dependency-changed=changed.txt")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines("""
+        *collected 6 items / 2 deselected / 4 selected
+        test_a.py::test_a PASSED
+        test_b.py::test_c PASSED
+        test_b.py::test_d PASSED
+        test_c.py::test_e PASSED
+    """)
+
+
+def test_changed_missing_file(ctestdir):
+    ctestdir.makepyfile("""
+        def test_a():
+            pass
+    """)
+    result = ctestdir.runpytest("--dependency-changed=missing.txt")
+    result.stderr.fnmatch_lines("""
+        *cannot read changed paths*
+    """)
@@ -0,0 +1,68 @@
+"""
+Resolve dependencies with a custom pytest_dependency_resolve hook.
+"""
+
+
+def test_resolve_hook(ctestdir):
+    ctestdir.makeconftest("""
+        import sys
+        import pytest
+        if "pytest_dependency" not in sys.modules:
+            pytest_plugins = "pytest_dependency"
+
+        TICKETS = {}
+        CALLS = []
+
+        def pytest_configure(config):
+            config.addinivalue_line("markers", "ticket(id): ticket id")
+
+        @pytest.hookimpl(tryfirst=True)
+        def pytest_collection_modifyitems(items):
+            for item in items:
+                marker = item.get_closest_marker("ticket")
+                if marker is not None:
+                    TICKETS[marker.args[0]] = item
+
+        def pytest_dependency_resolve(item, dependency):
+            if dependency.name.startswith("ticket:"):
+                CALLS.append(dependency.name)
+                return TICKETS.get(dependency.name[len("ticket:"):])
+
+        def pytest_terminal_summary(terminalreporter):
+            terminalreporter.write_line("resolve calls: %d" % len(CALLS))
+    """)
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(depends=["ticket:T-2"])
+        def test_a():
+            pass
+
+        @pytest.mark.ticket("T-1")
+        @pytest.mark.dependency()
+        def test_b():
+            assert False
+
+        @pytest.mark.ticket("T-2")
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=["ticket:T-1", "test_c"])
+        def test_d():
+            pass
+
+        @pytest.mark.dependency(depends=["ticket:T-3"])
+        def test_e():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2, skipped=2, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_b FAILED
+        *::test_c PASSED
+        *::test_a PASSED
+        *::test_d SKIPPED
+        *::test_e SKIPPED
+        resolve calls: 3
+    """)
@@ -0,0 +1,106 @@
+"""
+Merge dependency markers applied at several levels.
+"""
+
+
+def test_class_marker(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_b"])
+        class TestClass(object):
+
+            @pytest.mark.dependency(name="c")
+            def test_c(self):
+                pass
+
+            @pytest.mark.dependency(depends=["test_a", "test_b"])
+            def test_d(self):
+                pass
+
+        @pytest.mark.dependency(depends=["c"])
+        def test_e():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a FAILED
+        *::test_b PASSED
+        *::TestClass::test_c PASSED
+        *::TestClass::test_d SKIPPED
+        *::test_e PASSED
+    """)
+
+
+def test_module_marker(ctestdir):
+    test_a = """
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """
+    test_b = """
+        import pytest
+
+        pytestmark = pytest.mark.dependency(scope="session", depends=[
+            "test_a.py::test_b",
+        ])
+
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=["test_c"])
+        @pytest.mark.dependency(scope="session", depends=["test_a.py::test_a"])
+        def test_d():
+            pass
+    """
+    ctestdir.makepyfile(test_a=test_a, test_b=test_b)
+    result = ctestdir.runpytest("--verbose", "test_a.py", "test_b.py")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a FAILED
+        *::test_b PASSED
+        *::test_c PASSED
+        *::test_d SKIPPED
+    """)
+
+
+def test_named_class_marker(ctestdir):
+    """
+    A method marker does not inherit the name of the class marker.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(name="suite")
+        class TestClass(object):
+
+            @pytest.mark.dependency()
+            def test_a(self):
+                pass
+
+            @pytest.mark.dependency(depends=["TestClass::test_a"])
+            def test_b(self):
+                pass
+
+        @pytest.mark.dependency(depends=["TestClass::test_a"])
+        def test_c():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3)
+    assert "INTERNALERROR" not in result.stdout.str()
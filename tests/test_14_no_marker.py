@@ -0,0 +1,51 @@
+"""
+Drop the per-test hooks if no test is marked.
+"""
+
+
+def test_no_marker(ctestdir):
+    ctestdir.makepyfile("""
+        def test_a(request):
+            plugin = request.config.pluginmanager.get_plugin("dependency-runtest")
+            assert plugin is None
+
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2)
+
+
+def test_marker(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        def test_a(request):
+            plugin = request.config.pluginmanager.get_plugin("dependency-runtest")
+            assert plugin is not None
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2)
+
+
+def test_automark(ctestdir):
+    ctestdir.makefile('.ini', pytest="""
+        [pytest]
+        automark_dependency = true
+        console_output_style = classic
+    """)
+    ctestdir.makepyfile("""
+        from pytest_dependency import depends
+
+        def test_a():
+            assert False
+
+        def test_b(request):
+            depends(request, ["test_a"])
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(skipped=1, failed=1)
@@ -0,0 +1,73 @@
+"""
+Skip the rest of a dependency chain once it exceeded its time budget.
+"""
+
+
+def test_budget(ctestdir):
+    ctestdir.makepyfile("""
+        import time
+        import pytest
+
+        @pytest.mark.dependency(budget=0.5)
+        def test_a():
+            time.sleep(0.3)
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            time.sleep(0.3)
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_c():
+            pass
+
+        @pytest.mark.dependency()
+        def test_d():
+            time.sleep(0.6)
+
+        @pytest.mark.dependency(depends=["test_d"])
+        def test_e():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "-rs")
+    result.assert_outcomes(passed=4, skipped=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_b PASSED
+        *::test_c SKIPPED
+        *::test_d PASSED
+        *::test_e PASSED
+    """)
+    result.stdout.fnmatch_lines("""
+        *test_c skipped, the chain of test_a exceeded its budget of 0.50s*
+    """)
+
+
+def test_default_budget(ctestdir):
+    ctestdir.makepyfile("""
+        import time
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            time.sleep(0.2)
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(budget=1.0)
+        def test_c():
+            time.sleep(0.2)
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_d():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-chain-budget=0.1")
+    result.assert_outcomes(passed=3, skipped=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_b SKIPPED
+        *::test_c PASSED
+        *::test_d PASSED
+    """)
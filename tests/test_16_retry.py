@@ -0,0 +1,73 @@
+"""
+Retry failing prerequisites before skipping the dependent tests.
+"""
+
+
+def test_retries(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        attempts = {"a": 0, "c": 0}
+
+        @pytest.mark.dependency(retries=2)
+        def test_a():
+            attempts["a"] += 1
+            assert attempts["a"] > 2
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            assert attempts["a"] == 3
+
+        @pytest.mark.dependency(retries=1)
+        def test_c():
+            attempts["c"] += 1
+            assert False
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_d():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_b PASSED
+        *::test_c FAILED
+        *::test_d SKIPPED
+        *= retried dependencies =*
+        *::test_a: 3 attempts
+        *::test_c: 2 attempts
+    """)
+
+
+def test_default_retries(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        attempts = {"a": 0, "c": 0}
+
+        @pytest.mark.dependency()
+        def test_a():
+            attempts["a"] += 1
+            assert attempts["a"] > 1
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            attempts["c"] += 1
+            assert False
+
+        def test_d():
+            assert attempts["c"] == 1
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-retries=1")
+    result.assert_outcomes(passed=3, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_b PASSED
+        *::test_c FAILED
+        *::test_d PASSED
+    """)
@@ -0,0 +1,81 @@
+"""
+Dependencies in the package and directory scopes.
+"""
+
+
+def test_package_scope(ctestdir):
+    pkg = ctestdir.mkpydir("pkg")
+    pkg.join("test_a.py").write("""
+import pytest
+
+@pytest.mark.dependency()
+def test_a():
+    assert False
+
+@pytest.mark.dependency()
+def test_b():
+    pass
+""")
+    pkg.join("test_b.py").write("""
+import pytest
+
+@pytest.mark.dependency(scope="package", depends=["test_a.py::test_a"])
+def test_c():
+    pass
+
+@pytest.mark.dependency(scope="package", depends=["test_a.py::test_b"])
+def test_d():
+    pass
+""")
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        pkg/test_a.py::test_a FAILED
+        pkg/test_a.py::test_b PASSED
+        pkg/test_b.py::test_c SKIPPED
+        pkg/test_b.py::test_d PASSED
+    """)
+
+
+def test_directory_scope(ctestdir):
+    sub = ctestdir.mkdir("sub")
+    sub.mkdir("deeper").join("test_a.py").write("""
+import pytest
+
+@pytest.mark.dependency()
+def test_a():
+    assert False
+
+@pytest.mark.dependency()
+def test_b():
+    pass
+""")
+    sub.join("test_b.py").write("""
+import pytest
+
+@pytest.mark.dependency(scope="directory", depends=["deeper/test_a.py::test_a"])
+def test_c():
+    pass
+
+@pytest.mark.dependency(scope="directory", depends=["deeper/test_a.py::test_b"])
+def test_d():
+    pass
+
+@pytest.mark.dependency(scope="directory", depends=["test_b.py::test_d"])
+def test_e():
+    pass
+
+@pytest.mark.dependency(scope="directory", depends=["test_a.py::test_b"])
+def test_f():
+    pass
+""")
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3, skipped=2, failed=1)
+    result.stdout.fnmatch_lines_random("""
+        sub/deeper/test_a.py::test_a FAILED
+        sub/deeper/test_a.py::test_b PASSED
+        sub/test_b.py::test_c SKIPPED
+        sub/test_b.py::test_d PASSED
+        sub/test_b.py::test_e PASSED
+        sub/test_b.py::test_f SKIPPED
+    """)
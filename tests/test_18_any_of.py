@@ -0,0 +1,149 @@
+"""
+Depend on any one or on at least some of a group of tests.
+"""
+
+
+def test_any_of(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of, at_least
+
+        @pytest.mark.dependency(depends=[any_of("test_b", "test_c")])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            assert False
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=[at_least(2, "test_b", "test_c", "test_f")])
+        def test_d():
+            pass
+
+        @pytest.mark.dependency(depends=[at_least(2, "test_b", "test_c"), "test_c"])
+        def test_e():
+            pass
+
+        @pytest.mark.dependency()
+        def test_f():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "-rs")
+    result.assert_outcomes(passed=4, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_b FAILED
+        *::test_c PASSED
+        *::test_a PASSED
+        *::test_e SKIPPED
+        *::test_f PASSED
+        *::test_d PASSED
+    """)
+    result.stdout.fnmatch_lines("""
+        *test_e depends on at least 2 of (*test_b*, *test_c*), of which 1 passed
+    """)
+
+
+def test_any_of_runtime(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of, depends
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c(request):
+            depends(request, [any_of("test_a", "test_b")])
+
+        @pytest.mark.dependency()
+        def test_d(request):
+            depends(request, [any_of("test_a", "test_x")])
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_a FAILED
+        *::test_b PASSED
+        *::test_c PASSED
+        *::test_d SKIPPED
+    """)
+
+
+def test_any_of_unknown(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=[any_of("test_a", "test_x")])
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2)
+
+
+def test_groups_only_reorder(ctestdir):
+    """
+    Tests are reordered if the only dependencies declared are groups.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of
+
+        @pytest.mark.dependency(depends=[any_of("test_b", "test_c")])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        *::test_b PASSED
+        *::test_c PASSED
+        *::test_a PASSED
+    """)
+
+
+def test_at_least_unknown(ctestdir):
+    """
+    The skip message counts the members of the group that do not exist.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import at_least
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(
+            depends=[at_least(2, "test_b", "test_x", "test_y")]
+        )
+        def test_a():
+            pass
+    """)
+    result = ctestdir.runpytest("-rs")
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines("""
+        *test_a depends on at least 2 of (*test_b*, *test_x*, *test_y*), of which 1 passed and 2 do not exist
+    """)
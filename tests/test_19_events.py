@@ -0,0 +1,45 @@
+"""
+Write the dependency events to a JSON lines file.
+"""
+
+import json
+
+
+def test_events(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            assert False
+    """)
+    result = ctestdir.runpytest("--dependency-events=events.jsonl")
+    result.assert_outcomes(skipped=1, failed=1)
+
+    with open(str(ctestdir.tmpdir.join("events.jsonl"))) as f:
+        events = [json.loads(line) for line in f]
+    by_type = {}
+    for event in events:
+        by_type.setdefault(event["event"], []).append(event)
+
+    assert [e["nodeid"] for e in by_type["registered"]] == [
+        "test_events.py::test_a",
+        "test_events.py::test_b",
+    ]
+    resolved, = by_type["resolved"]
+    assert resolved["dependency"] == "test_b"
+    assert resolved["resolved"] == "test_events.py::test_b"
+    assert [(e["nodeid"], e["reason"]) for e in by_type["scheduled"]] == [
+        ("test_events.py::test_b", "ready"),
+        ("test_events.py::test_a", "ready"),
+    ]
+    assert ("test_events.py::test_b", "call", "failed") in [
+        (e["nodeid"], e["phase"], e["outcome"]) for e in by_type["outcome"]
+    ]
+    skipped, = by_type["skipped"]
+    assert skipped["nodeid"] == "test_events.py::test_a"
+    assert skipped["blocker"] == "test_b"
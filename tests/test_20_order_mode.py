@@ -0,0 +1,55 @@
+"""
+Check the order of the tests or leave it alone instead of reordering.
+"""
+
+TEST_MODULE = """
+    import pytest
+
+    @pytest.mark.dependency(depends=["test_b"])
+    def test_a():
+        pass
+
+    @pytest.mark.dependency(depends=["test_c"])
+    def test_b():
+        pass
+
+    @pytest.mark.dependency()
+    def test_c():
+        pass
+"""
+
+
+def test_order_check(ctestdir):
+    ctestdir.makepyfile(test_a=TEST_MODULE)
+    result = ctestdir.runpytest("--verbose", "--dependency-order=check")
+    result.assert_outcomes(passed=1, skipped=2)
+    result.stderr.fnmatch_lines("""
+        2 tests run before their dependencies:
+          test_a runs before test_b
+          test_b runs before test_c
+    """)
+    result.stdout.fnmatch_lines("""
+        *::test_a SKIPPED
+        *::test_b SKIPPED
+        *::test_c PASSED
+    """)
+
+
+def test_order_check_ok(ctestdir):
+    ctestdir.makepyfile(test_a=TEST_MODULE)
+    result = ctestdir.runpytest("--verbose", "--dependency-order=check",
+                                "test_a.py::test_c", "test_a.py::test_b")
+    result.assert_outcomes(passed=2)
+    assert "before their dependencies" not in result.stderr.str()
+
+
+def test_order_off(ctestdir):
+    ctestdir.makepyfile(test_a=TEST_MODULE)
+    result = ctestdir.runpytest("--verbose", "--dependency-order=off")
+    result.assert_outcomes(passed=1, skipped=2)
+    result.stdout.fnmatch_lines("""
+        *::test_a SKIPPED
+        *::test_b SKIPPED
+        *::test_c PASSED
+    """)
+    assert "before their dependencies" not in result.stderr.str()
@@ -0,0 +1,101 @@
+"""
+Register items and outcomes from several threads at once.
+"""
+
+
+def test_concurrent_registration(ctestdir):
+    ctestdir.makeconftest("""
+        import sys
+        import threading
+        import pytest
+        if "pytest_dependency" not in sys.modules:
+            pytest_plugins = "pytest_dependency"
+
+        INSTANCES = {}
+
+        @pytest.hookimpl(tryfirst=True)
+        def pytest_collection_modifyitems(items):
+            from pytest_dependency import Item
+            barrier = threading.Barrier(8)
+
+            def register():
+                barrier.wait()
+                for item in reversed(items):
+                    INSTANCES.setdefault(item.nodeid, set()).add(id(Item.get(item)))
+
+            threads = [threading.Thread(target=register) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    """)
+    ctestdir.makepyfile("""
+        import pytest
+        from conftest import INSTANCES
+
+        @pytest.mark.parametrize("x", range(200))
+        @pytest.mark.dependency()
+        def test_a(x):
+            pass
+
+        def test_instances():
+            assert len(INSTANCES) == 201
+            assert all(len(ids) == 1 for ids in INSTANCES.values())
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=201)
+
+
+def test_concurrent_reports(ctestdir):
+    ctestdir.makepyfile("""
+        import threading
+        import pytest
+        from pytest_dependency import Item, at_least
+
+        N = 64
+
+        class Report(object):
+            def __init__(self, nodeid, when, outcome):
+                self.nodeid = nodeid
+                self.when = when
+                self.outcome = outcome
+                self.duration = 0.0
+
+        @pytest.mark.parametrize("x", range(N))
+        @pytest.mark.dependency()
+        def test_a(x):
+            pass
+
+        @pytest.mark.dependency(depends=[
+            at_least(N, *["test_a[%d]" % x for x in range(N)])
+        ])
+        def test_b(request):
+            items = [
+                Item.get(item) for item in request.session.items
+                if item.name.startswith("test_a")
+            ]
+            requirement, = Item.get(request.node).requirements
+            assert requirement.passed == N
+            barrier = threading.Barrier(N)
+
+            def flap(item):
+                nodeid = item.pytest_item.nodeid
+                barrier.wait()
+                for _ in range(200):
+                    item.add_report(Report(nodeid, "call", "failed"))
+                    item.add_report(Report(nodeid, "call", "passed"))
+
+            threads = [
+                threading.Thread(target=flap, args=(item,)) for item in items
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert requirement.passed == N
+            assert requirement.failed == 0
+            assert all(item.passed for item in items)
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=65)
@@ -0,0 +1,59 @@
+"""
+Treat a prerequisite that took too long as failed.
+"""
+
+
+def test_max_duration(ctestdir):
+    ctestdir.makepyfile("""
+        import time
+        import pytest
+
+        @pytest.mark.dependency(max_duration=0.2)
+        def test_fast():
+            pass
+
+        @pytest.mark.dependency(max_duration=0.05)
+        def test_slow():
+            time.sleep(0.3)
+
+        @pytest.mark.dependency(depends=["test_fast"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_slow"])
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "-rs")
+    result.assert_outcomes(passed=3, skipped=1)
+    result.stdout.fnmatch_lines("""
+        *::test_fast PASSED
+        *::test_slow PASSED
+        *::test_a PASSED
+        *::test_b SKIPPED
+    """)
+    result.stdout.fnmatch_lines("""
+        *test_b depends on test_slow, which took longer than 0.05s
+    """)
+
+
+def test_max_duration_group(ctestdir):
+    ctestdir.makepyfile("""
+        import time
+        import pytest
+        from pytest_dependency import any_of
+
+        @pytest.mark.dependency(max_duration=0.05)
+        def test_slow():
+            time.sleep(0.3)
+
+        @pytest.mark.dependency(depends=[any_of("test_slow")])
+        def test_a():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines("""
+        *::test_slow PASSED
+        *::test_a SKIPPED
+    """)
@@ -0,0 +1,228 @@
+"""
+Plan the tests from the source, without importing it.
+"""
+
+
+def test_plan_order(ctestdir):
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+
+        class TestClass(object):
+            @pytest.mark.dependency(depends=["test_e"], scope="class")
+            def test_d(self):
+                pass
+
+            @pytest.mark.dependency()
+            def test_e(self):
+                pass
+    """, test_plan="""
+        from pytest_dependency.plan import StaticPlan
+
+        def test_plan(request):
+            rootdir = str(request.config.rootdir)
+            plan = StaticPlan.scan([rootdir], rootdir, jobs=1)
+            assert [test.nodeid for test in plan.order()] == [
+                "test_order.py::test_c",
+                "test_order.py::test_b",
+                "test_order.py::test_a",
+                "test_order.py::TestClass::test_e",
+                "test_order.py::TestClass::test_d",
+            ]
+            assert [len(members) for members in plan.components()] == [3, 2]
+            assert not plan.unresolved
+            assert not plan.cycles()
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=6)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_c PASSED
+        test_order.py::test_b PASSED
+        test_order.py::test_a PASSED
+        test_order.py::TestClass::test_e PASSED
+        test_order.py::TestClass::test_d PASSED
+        test_plan.py::test_plan PASSED
+    """)
+
+
+def test_plan_scopes(ctestdir):
+    ctestdir.mkpydir("pkg")
+    ctestdir.mkpydir("pkg/sub")
+    ctestdir.makepyfile(**{
+        "pkg/sub/test_x": """
+            import pytest
+
+            @pytest.mark.dependency()
+            def test_x():
+                pass
+
+            @pytest.mark.parametrize("p", [1, 2])
+            @pytest.mark.dependency()
+            def test_p(p):
+                pass
+        """,
+        "pkg/test_y": """
+            import pytest
+            from pytest_dependency import any_of
+
+            pytestmark = pytest.mark.dependency()
+
+            @pytest.mark.dependency(
+                depends=["sub/test_x.py::test_x", "test_y.py::test_z"],
+                scope="package",
+            )
+            def test_y():
+                pass
+
+            def test_z():
+                pass
+
+            @pytest.mark.dependency(depends=[
+                ("session", "pkg/sub/test_x.py::test_p[1]"),
+                any_of("test_missing", "test_z"),
+            ])
+            def test_w():
+                pass
+        """,
+        "test_plan": """
+            from pytest_dependency.plan import StaticPlan
+
+            def test_plan(request):
+                rootdir = str(request.config.rootdir)
+                plan = StaticPlan.scan([rootdir + "/pkg"], rootdir, jobs=2)
+                prerequisites = {
+                    test.nodeid: sorted(
+                        depend.nodeid for depend in plan.prerequisites(test)
+                    )
+                    for test in plan
+                }
+                assert prerequisites == {
+                    "pkg/sub/test_x.py::test_x": [],
+                    "pkg/sub/test_x.py::test_p": [],
+                    "pkg/test_y.py::test_y": [
+                        "pkg/sub/test_x.py::test_x",
+                        "pkg/test_y.py::test_z",
+                    ],
+                    "pkg/test_y.py::test_z": [],
+                    "pkg/test_y.py::test_w": [
+                        "pkg/sub/test_x.py::test_p",
+                        "pkg/test_y.py::test_z",
+                    ],
+                }
+                assert not plan.unresolved
+        """,
+    })
+    result = ctestdir.runpytest("--verbose", "test_plan.py")
+    result.assert_outcomes(passed=1)
+
+
+def test_plan_match_params(ctestdir):
+    """
+    The planner resolves names with match_params as they are at runtime.
+    """
+    ctestdir.makepyfile(test_params="""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_x():
+            pass
+
+        @pytest.mark.parametrize("p", [1, 2])
+        @pytest.mark.dependency()
+        def test_p(p):
+            pass
+
+        @pytest.mark.parametrize("p", [1, 2])
+        @pytest.mark.dependency(depends=["test_p"], match_params=True)
+        def test_q(p):
+            pass
+
+        @pytest.mark.parametrize("p", [1, 2])
+        @pytest.mark.dependency(depends=["test_p"])
+        def test_r(p):
+            pass
+
+        @pytest.mark.dependency(depends=["test_p"], match_params=True)
+        def test_s():
+            pass
+
+        @pytest.mark.parametrize("p", [1, 2])
+        @pytest.mark.dependency(depends=["test_x"], match_params=True)
+        def test_t(p):
+            pass
+    """, test_plan="""
+        from pytest_dependency.plan import StaticPlan
+
+        def test_plan(request):
+            rootdir = str(request.config.rootdir)
+            plan = StaticPlan.scan([rootdir + "/test_params.py"], rootdir, jobs=1)
+            assert sorted(test.function for test, _ in plan.unresolved) == [
+                "test_r", "test_s", "test_t",
+            ]
+            q, = (test for test in plan if test.function == "test_q")
+            assert [depend.function for depend in plan.prerequisites(q)] == ["test_p"]
+    """)
+    result = ctestdir.runpytest("--verbose", "test_plan.py", "test_params.py")
+    result.assert_outcomes(passed=6, skipped=5)
+    result.stdout.fnmatch_lines_random("""
+        test_params.py::test_q?1? PASSED
+        test_params.py::test_q?2? PASSED
+        test_params.py::test_r?1? SKIPPED
+        test_params.py::test_r?2? SKIPPED
+        test_params.py::test_s SKIPPED
+        test_params.py::test_t?1? SKIPPED
+        test_params.py::test_t?2? SKIPPED
+    """)
+
+
+def test_plan_problems(ctestdir):
+    ctestdir.makepyfile(test_problems="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_missing", NAME])
+        def test_c():
+            pass
+    """, test_plan="""
+        import json
+        from pytest_dependency.plan import main
+
+        def test_plan(request, capsys):
+            rootdir = str(request.config.rootdir)
+            status = main(["plan", "--json", "--rootdir", rootdir, rootdir])
+            assert status == 1
+            data = json.loads(capsys.readouterr().out)
+            assert data["unresolved"] == [{
+                "nodeid": "test_problems.py::test_c",
+                "dependency": "test_missing",
+            }]
+            assert data["cycles"] == [[
+                "test_problems.py::test_a",
+                "test_problems.py::test_b",
+            ]]
+            assert data["order"][-2:] == [
+                "test_problems.py::test_a",
+                "test_problems.py::test_b",
+            ]
+            assert len(data["errors"]) == 1
+    """)
+    result = ctestdir.runpytest("--verbose", "test_plan.py")
+    result.assert_outcomes(passed=1)
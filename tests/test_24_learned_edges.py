@@ -0,0 +1,128 @@
+"""
+Order the tests by the dependencies declared at runtime in earlier runs.
+"""
+
+import json
+
+
+def test_learned_edges(ctestdir):
+    ctestdir.makepyfile(test_learned="""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_a(request):
+            depends(request, ["test_b"])
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines("""
+        test_learned.py::test_a SKIPPED
+        test_learned.py::test_b PASSED
+    """)
+
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines("""
+        test_learned.py::test_b PASSED
+        test_learned.py::test_a PASSED
+    """)
+
+    cache = ctestdir.tmpdir.join(".pytest_cache", "v", "dependency", "edges")
+    assert json.loads(cache.read()) == {
+        "test_learned.py::test_a": ["test_learned.py::test_b"],
+    }
+
+
+def test_learned_edges_pruned(ctestdir):
+    ctestdir.makepyfile(test_learned="""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_a(request):
+            depends(request, ["test_b"])
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """, test_other="""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_c(request):
+            depends(request, ["test_d"])
+
+        @pytest.mark.dependency()
+        def test_d():
+            pass
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=2, skipped=2)
+    cache = ctestdir.tmpdir.join(".pytest_cache", "v", "dependency", "edges")
+    assert json.loads(cache.read()) == {
+        "test_learned.py::test_a": ["test_learned.py::test_b"],
+        "test_other.py::test_c": ["test_other.py::test_d"],
+    }
+
+    ctestdir.makepyfile(test_learned="""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+    """)
+    result = ctestdir.runpytest("test_learned.py")
+    result.assert_outcomes(passed=1)
+    assert json.loads(cache.read()) == {
+        "test_other.py::test_c": ["test_other.py::test_d"],
+    }
+
+
+def test_learned_edges_partial_run(ctestdir):
+    """
+    Running some tests of a module by node id keeps the edges of the
+    others, as well as those on tests not collected.
+    """
+    ctestdir.makepyfile(test_learned="""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_a(request):
+            depends(request, ["test_b"])
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        def test_c():
+            pass
+    """)
+    ctestdir.runpytest()
+    cache = ctestdir.tmpdir.join(".pytest_cache", "v", "dependency", "edges")
+    learned = {"test_learned.py::test_a": ["test_learned.py::test_b"]}
+    assert json.loads(cache.read()) == learned
+
+    result = ctestdir.runpytest("test_learned.py::test_c")
+    result.assert_outcomes(passed=1)
+    assert json.loads(cache.read()) == learned
+
+    result = ctestdir.runpytest("test_learned.py::test_a")
+    result.assert_outcomes(skipped=1)
+    assert json.loads(cache.read()) == learned
+
+    result = ctestdir.runpytest("-k", "not test_b")
+    assert json.loads(cache.read()) == learned
+
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        test_learned.py::test_b PASSED
+        test_learned.py::test_a PASSED
+    """)
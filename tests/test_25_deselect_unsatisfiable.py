@@ -0,0 +1,62 @@
+"""
+Deselect the tests whose dependencies cannot be resolved.
+"""
+
+
+def test_deselect_unsatisfiable(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import any_of, at_least
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_missing"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_c():
+            pass
+
+        @pytest.mark.dependency(depends=[any_of("test_a", "test_b")])
+        def test_d():
+            pass
+
+        @pytest.mark.dependency(depends=[at_least(2, "test_a", "test_c")])
+        def test_e():
+            pass
+
+        @pytest.mark.dependency(depends=["test_a", "test_d"])
+        def test_f():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "--deselect-unsatisfiable")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        *3 deselected*
+    """)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_d PASSED
+        *::test_f PASSED
+    """)
+
+
+def test_deselect_unsatisfiable_ignore_unknown(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_missing"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest(
+        "--verbose", "--deselect-unsatisfiable", "--ignore-unknown-dependency",
+    )
+    result.assert_outcomes(passed=2)
@@ -0,0 +1,286 @@
+"""
+Run the groups of connected tests in forked worker processes.
+"""
+
+import os
+import signal
+
+
+def test_workers(ctestdir):
+    ctestdir.makepyfile("""
+        import os
+        import pytest
+
+        PIDS = {}
+
+        def record(name):
+            with open(name + ".pid", "w") as f:
+                f.write(str(os.getpid()))
+
+        @pytest.mark.dependency()
+        def test_a():
+            record("a")
+
+        @pytest.mark.dependency()
+        def test_b():
+            record("b")
+            assert False
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_c():
+            record("c")
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_d():
+            record("d")
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-workers=2")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    assert result.ret == 1
+    assert "INTERNALERROR" not in result.stdout.str()
+    result.stdout.fnmatch_lines_random("""
+        *::test_a PASSED
+        *::test_b FAILED
+        *::test_c PASSED
+        *::test_d SKIPPED
+    """)
+
+    def pid(name):
+        return int(ctestdir.tmpdir.join(name + ".pid").read())
+
+    assert pid("a") == pid("c")
+    assert pid("b") != pid("a")
+
+
+def test_workers_skip_summary(ctestdir):
+    """
+    The skips reported by the workers are listed in the short summary.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            assert False
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        def test_c():
+            pytest.skip("not today")
+    """)
+    result = ctestdir.runpytest("-rs", "--dependency-workers=2")
+    result.assert_outcomes(skipped=2, failed=1)
+    assert result.ret == 1
+    assert "INTERNALERROR" not in result.stdout.str()
+    result.stdout.fnmatch_lines_random("""
+        SKIP* test_b depends on test_a, which did not pass
+        SKIP* not today
+    """)
+
+
+def test_workers_maxfail(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.parametrize("x", range(20))
+        def test_a(x):
+            assert x != 3
+    """)
+    result = ctestdir.runpytest("--dependency-workers=2", "-x")
+    outcomes = result.parseoutcomes()
+    assert outcomes["failed"] == 1
+    assert outcomes.get("passed", 0) < 19
+
+
+def test_workers_runtime_depends(ctestdir):
+    """
+    A dependency declared at runtime on a test run by another worker
+    is read from the shared outcome table, waiting for it if needed.
+    """
+    ctestdir.makepyfile(test_a="""
+        import time
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            time.sleep(0.5)
+
+        @pytest.mark.dependency()
+        def test_b():
+            time.sleep(0.5)
+            assert False
+    """, test_z="""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_c(request):
+            depends(request, ["test_a.py::test_a"], scope='session')
+
+        @pytest.mark.dependency()
+        def test_d(request):
+            depends(request, ["test_a.py::test_b"], scope='session')
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-workers=4")
+    result.assert_outcomes(passed=2, skipped=1, failed=1)
+    assert result.ret == 1
+    assert "INTERNALERROR" not in result.stdout.str()
+    result.stdout.fnmatch_lines_random("""
+        test_a.py::test_a PASSED
+        test_a.py::test_b FAILED
+        test_z.py::test_c PASSED
+        test_z.py::test_d SKIPPED
+    """)
+
+
+def test_workers_runtime_depends_order(ctestdir, monkeypatch):
+    """
+    Each worker runs its tests in the order of the session, even across
+    components, so that two workers never wait for each other.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import depends
+
+        @pytest.mark.dependency()
+        def test_p0():
+            pass
+
+        @pytest.mark.dependency()
+        def test_p1():
+            pass
+
+        @pytest.mark.dependency()
+        def test_p2(request):
+            depends(request, ["test_p1"])
+
+        @pytest.mark.dependency(depends=["test_p0"])
+        def test_p3(request):
+            depends(request, ["test_p2"])
+
+        @pytest.mark.dependency(depends=["test_p2"])
+        def test_p4():
+            pass
+
+        @pytest.mark.dependency(depends=["test_p2"])
+        def test_p5():
+            pass
+    """)
+    # Run in a subprocess, which is killed if the workers block.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(
+        filter(None, (root, os.environ.get("PYTHONPATH")))
+    ))
+    result = ctestdir.runpytest_subprocess("--dependency-workers=2", timeout=60)
+    result.assert_outcomes(passed=6)
+    assert result.ret == 0
+
+
+def test_workers_lost(ctestdir):
+    """
+    A worker ending before running all its tests is reported with its
+    exit code or the signal that killed it.
+    """
+    ctestdir.makepyfile(test_exit="""
+        import os
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            os._exit(3)
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+    """, test_kill="""
+        import os
+        import signal
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_c():
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_d():
+            pass
+    """)
+    result = ctestdir.runpytest("--dependency-workers=2")
+    assert result.ret != 0
+    output = result.stdout.str()
+    assert "exited with exit code 3 before running 2 tests" in output
+    assert "was killed by signal %d before running 2 tests" % signal.SIGKILL in output
+
+
+def test_outcome_table(ctestdir):
+    ctestdir.makepyfile("""
+        import os
+        from pytest_dependency.shared import OutcomeTable
+
+        def test_shared():
+            items = ["a", "b", "c"]
+            table = OutcomeTable(items)
+            pid = os.fork()
+            if not pid:
+                table.set("a", True)
+                table.set("b", False)
+                os._exit(0)
+            os.waitpid(pid, 0)
+            assert table.wait("a", "c") is True
+            assert table.wait("b", "c") is False
+            assert table.get("c") is None
+            assert table.wait("c", "a") is None
+            assert table.get("x") is None
+            table.close()
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_workers_exclusive_resources(ctestdir):
+    ctestdir.makepyfile(test_a="""
+        import os
+        import pytest
+
+        def record(name):
+            with open(name + ".pid", "w") as f:
+                f.write(str(os.getpid()))
+
+        @pytest.mark.dependency(resources=["db"], exclusive=True)
+        def test_write():
+            record("write")
+
+        @pytest.mark.dependency(resources=["port"])
+        def test_serve():
+            record("serve")
+    """, test_b="""
+        import os
+        import pytest
+
+        def record(name):
+            with open(name + ".pid", "w") as f:
+                f.write(str(os.getpid()))
+
+        @pytest.mark.dependency(resources=["db"])
+        def test_read():
+            record("read")
+
+        @pytest.mark.dependency(resources=["port"])
+        def test_connect():
+            record("connect")
+    """)
+    result = ctestdir.runpytest("--dependency-workers=4")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines("""
+        *= dependency workers =*
+        exclusive resource db joins 2 groups of tests
+        estimated time *s, *s without exclusive resources (+*%)
+    """)
+
+    def pid(name):
+        return int(ctestdir.tmpdir.join(name + ".pid").read())
+
+    assert pid("write") == pid("read")
+    assert len({pid("write"), pid("serve"), pid("connect")}) == 3
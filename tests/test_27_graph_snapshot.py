@@ -0,0 +1,198 @@
+"""
+Read the order of the tests from a graph snapshot.
+"""
+
+
+def test_graph_snapshot(ctestdir):
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+    """, test_snapshot="""
+        from pytest_dependency.snapshot import GraphSnapshot
+
+        def test_snapshot():
+            with GraphSnapshot.open("graph.bin") as snapshot:
+                assert len(snapshot) == 3
+                assert [snapshot.nodeid(i) for i in snapshot.order()] == [
+                    "test_order.py::test_b",
+                    "test_order.py::test_c",
+                    "test_order.py::test_a",
+                ]
+                assert snapshot.prerequisites(0) == [2]
+                assert snapshot.prerequisites(1) == []
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-graph=graph.bin", "test_order.py")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_b PASSED
+        test_order.py::test_c PASSED
+        test_order.py::test_a PASSED
+    """)
+    result = ctestdir.runpytest("test_snapshot.py")
+    result.assert_outcomes(passed=1)
+
+
+def test_graph_snapshot_reused(ctestdir):
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+    """)
+    ctestdir.makeconftest("""
+        import sys
+        import pytest
+        if "pytest_dependency" not in sys.modules:
+            pytest_plugins = "pytest_dependency"
+
+        @pytest.hookimpl(trylast=True)
+        def pytest_collection_modifyitems(items):
+            from pytest_dependency.snapshot import GraphSnapshot
+            if not items[0].config.getoption("--dependency-graph"):
+                # Write a snapshot with a different, but valid order.
+                by_name = {item.name: item for item in items}
+                order = [by_name[name] for name in ("test_c", "test_a", "test_b")]
+                GraphSnapshot.write(
+                    "graph.bin", items, order, GraphSnapshot.edges(items),
+                    GraphSnapshot.digest(items, {}),
+                )
+    """)
+    result = ctestdir.runpytest("--dependency-order=off")
+    result.assert_outcomes(passed=2, skipped=1)
+
+    result = ctestdir.runpytest("--verbose", "--dependency-graph=graph.bin")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_c PASSED
+        test_order.py::test_a PASSED
+        test_order.py::test_b PASSED
+    """)
+
+    # A change of the dependencies invalidates the snapshot.
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency()
+        def test_c():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-graph=graph.bin")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_b PASSED
+        test_order.py::test_a PASSED
+        test_order.py::test_c PASSED
+    """)
+
+
+def test_graph_snapshot_edges(ctestdir):
+    """
+    The edges of a matching snapshot are used as they are, the
+    dependencies are not resolved again to build them.
+    """
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_c():
+            pass
+    """)
+    ctestdir.makeconftest("""
+        import sys
+        import pytest
+        if "pytest_dependency" not in sys.modules:
+            pytest_plugins = "pytest_dependency"
+
+        @pytest.hookimpl(hookwrapper=True)
+        def pytest_collection_modifyitems(config, items):
+            from pytest_dependency.parallel import ParallelRunner
+            from pytest_dependency.snapshot import GraphSnapshot
+            if not config.getoption("--dependency-graph"):
+                yield
+                # Write a snapshot with an edge from test_b to test_a.
+                edges = GraphSnapshot.edges(items)
+                edges[1].append(0)
+                GraphSnapshot.write(
+                    "graph.bin", items, items, edges,
+                    GraphSnapshot.digest(items, {}),
+                )
+                return
+            by_name = {item.name: item for item in items}
+            yield
+            edges = ParallelRunner.get(config).edges
+            assert edges[by_name["test_b"]] == (by_name["test_a"],)
+            assert edges[by_name["test_c"]] == (by_name["test_a"],)
+    """)
+    result = ctestdir.runpytest("--dependency-order=off")
+    result.assert_outcomes(passed=3)
+
+    result = ctestdir.runpytest("--dependency-graph=graph.bin", "--dependency-workers=2")
+    result.assert_outcomes(passed=3)
+
+
+def test_graph_snapshot_worker(ctestdir):
+    """
+    A worker of pytest-xdist does not write the snapshot.
+    """
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """)
+    ctestdir.makeconftest("""
+        import sys
+        if "pytest_dependency" not in sys.modules:
+            pytest_plugins = "pytest_dependency"
+
+        def pytest_configure(config):
+            config.workerinput = {}
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-graph=graph.bin")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_b PASSED
+        test_order.py::test_a PASSED
+    """)
+    assert not ctestdir.tmpdir.join("graph.bin").exists()
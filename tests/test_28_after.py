@@ -0,0 +1,87 @@
+"""
+Run tests after others without depending on them.
+"""
+
+
+def test_after(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(after=["test_b", "test_missing"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            assert False
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_c():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=1, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *::test_b FAILED
+        *::test_a PASSED
+        *::test_c SKIPPED
+    """)
+
+
+def test_after_plan(ctestdir):
+    ctestdir.makepyfile(test_order="""
+        import pytest
+
+        @pytest.mark.dependency(after=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """, test_plan="""
+        from pytest_dependency.plan import StaticPlan
+
+        def test_plan(request):
+            rootdir = str(request.config.rootdir)
+            plan = StaticPlan.scan([rootdir + "/test_order.py"], rootdir, jobs=1)
+            assert [test.nodeid for test in plan.order()] == [
+                "test_order.py::test_b",
+                "test_order.py::test_a",
+            ]
+            assert all(not plan.prerequisites(test) for test in plan)
+    """)
+    result = ctestdir.runpytest("--verbose")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines("""
+        test_order.py::test_b PASSED
+        test_order.py::test_a PASSED
+        test_plan.py::test_plan PASSED
+    """)
+
+
+def test_after_order_check(ctestdir):
+    """
+    A test that comes before a test it is to run after is reported.
+    """
+    ctestdir.makepyfile("""
+        import pytest
+
+        @pytest.mark.dependency(after=["test_b"])
+        def test_a():
+            pass
+
+        @pytest.mark.dependency()
+        def test_b():
+            pass
+    """)
+    result = ctestdir.runpytest("--verbose", "--dependency-order=check")
+    result.assert_outcomes(passed=2)
+    result.stderr.fnmatch_lines("""
+        1 tests run before their dependencies:
+          test_a runs before test_b
+    """)
+    result.stdout.fnmatch_lines("""
+        *::test_a PASSED
+        *::test_b PASSED
+    """)
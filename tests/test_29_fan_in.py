@@ -0,0 +1,34 @@
+"""
+A test depending on many other tests.
+"""
+
+
+def test_fan_in(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+
+        N = 500
+
+        @pytest.mark.parametrize("x", range(N))
+        @pytest.mark.dependency()
+        def test_a(x):
+            assert x != 321
+
+        @pytest.mark.parametrize("x", range(N))
+        @pytest.mark.dependency()
+        def test_b(x):
+            pass
+
+        @pytest.mark.dependency(depends=["test_a[%d]" % x for x in range(N)])
+        def test_all_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_b[%d]" % x for x in range(N)])
+        def test_all_b():
+            pass
+    """)
+    result = ctestdir.runpytest("-rs")
+    result.assert_outcomes(passed=1000, skipped=1, failed=1)
+    result.stdout.fnmatch_lines("""
+        *test_all_a depends on test_a?321?, which did not pass
+    """)
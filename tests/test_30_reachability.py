@@ -0,0 +1,82 @@
+"""
+Transitive queries on the dependency graph.
+"""
+
+
+def test_reachability_index(ctestdir):
+    ctestdir.makepyfile("""
+        import random
+        from pytest_dependency.graph import ReachabilityIndex
+
+        def search(successors, *nodes):
+            seen = set(nodes)
+            stack = list(nodes)
+            while stack:
+                for other in successors[stack.pop()]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            return seen
+
+        def test_random_graphs():
+            rng = random.Random(0)
+            for _ in range(200):
+                n = rng.randint(1, 30)
+                successors = {i: set() for i in range(n)}
+                for _ in range(rng.randint(0, 3 * n)):
+                    a, b = rng.randrange(n), rng.randrange(n)
+                    successors[min(a, b) if rng.random() < 0.8 else a].add(
+                        max(a, b) if rng.random() < 0.8 else b
+                    )
+                index = ReachabilityIndex(range(n), successors.__getitem__)
+                for a in range(n):
+                    reached = search(successors, a)
+                    assert index.reachable(a) == reached
+                    assert [index.reaches(a, b) for b in range(n)] == [
+                        b in reached for b in range(n)
+                    ]
+                assert index.reachable(0, n - 1) == search(successors, 0, n - 1)
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_graph_queries(ctestdir):
+    ctestdir.makepyfile("""
+        import pytest
+        from pytest_dependency import Item
+        from pytest_dependency.graph import DependencyGraph
+
+        @pytest.mark.dependency()
+        def test_a():
+            pass
+
+        @pytest.mark.dependency(depends=["test_a"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_b"])
+        def test_c():
+            pass
+
+        @pytest.mark.dependency()
+        def test_d():
+            pass
+
+        def test_graph(request):
+            items = {
+                item.name: Item.get(item)
+                for item in request.session.items
+                if item.name != "test_graph"
+            }
+            graph = DependencyGraph(*(item.pytest_item for item in items.values()))
+            a, b, c, d = (items[name] for name in ("test_a", "test_b", "test_c", "test_d"))
+            assert graph.descendants(a) == {a, b, c}
+            assert graph.ancestors(c) == {a, b, c}
+            assert graph.ancestors(b, d) == {a, b, d}
+            assert graph.reaches(a, c)
+            assert not graph.reaches(c, a)
+            assert not graph.reaches(a, d)
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=5)
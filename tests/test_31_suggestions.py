@@ -0,0 +1,91 @@
+"""
+Hints on the names meant by unknown dependencies.
+"""
+
+
+def test_name_index(ctestdir):
+    ctestdir.makepyfile("""
+        from pytest_dependency.suggest import NameIndex
+
+        def test_similar():
+            names = ["test_%d_%s" % (i, word)
+                     for i in range(200)
+                     for word in ("alpha", "beta", "gamma")]
+            index = NameIndex(names)
+            assert index.similar("test_17_gama")[0] == "test_17_gamma"
+            assert index.similar("test_17_gamma") != ["test_17_gamma"]
+            assert index.similar("something_else") == []
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_suggestions(ctestdir):
+    ctestdir.makepyfile(test_mod="""
+        import pytest
+
+        @pytest.mark.dependency()
+        def test_login():
+            pass
+
+        @pytest.mark.dependency(depends=["test_logni"])
+        def test_typo():
+            pass
+
+        @pytest.mark.dependency(depends=["test_login"], scope='session')
+        def test_scope():
+            pass
+
+        @pytest.mark.dependency(depends=["test_mod.py::test_logni"], scope='session')
+        def test_both():
+            pass
+
+        @pytest.mark.dependency(depends=["test_setup"])
+        def test_nothing_close():
+            pass
+
+        @pytest.mark.dependency(depends=["test_login"])
+        def test_known():
+            pass
+    """)
+    result = ctestdir.runpytest("-rs")
+    result.assert_outcomes(passed=2, skipped=4)
+    result.stdout.fnmatch_lines("""
+        *= unknown dependencies =*
+        test_typo depends on test_logni, which does not exist
+          did you mean test_login?
+        test_scope depends on test_login, which does not exist
+          test_login exists in module scope
+        test_both depends on test_mod.py::test_logni, which does not exist
+          did you mean test_mod.py::test_login?
+        test_nothing_close depends on test_setup, which does not exist
+    """)
+    assert "did you mean" not in result.stdout.str().split("test_setup,")[1]
+
+
+def test_suggestions_not_self(ctestdir):
+    """
+    The dependent test itself is never suggested.
+    """
+    ctestdir.makepyfile(test_mod="""
+        import pytest
+
+        @pytest.mark.dependency(depends=["test_c"])
+        def test_b():
+            pass
+
+        @pytest.mark.dependency(depends=["test_mod.py::test_c"], scope='session')
+        def test_d():
+            pass
+    """)
+    result = ctestdir.runpytest()
+    result.assert_outcomes(skipped=2)
+    result.stdout.fnmatch_lines("""
+        *= unknown dependencies =*
+        test_b depends on test_c, which does not exist
+          did you mean test_d?
+        test_d depends on test_mod.py::test_c, which does not exist
+          did you mean test_mod.py::test_b?
+    """)
+    assert "did you mean test_b?" not in result.stdout.str()
+    assert "test_mod.py::test_d?" not in result.stdout.str()